@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark for the CLI.
+
+Runs `runner.py --help` and `runner.py --list-frameworks` in fresh interpreters and fails
+(exit 1) if the median wall time exceeds the budget or if any framework SDK got imported.
+
+    python benchmarks/startup.py --runs 10 --budget-ms 300
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 300.0
+
+# modules that must never be imported just to start the CLI
+HEAVY_MODULES = ("crewai", "crewai_tools", "google.adk", "google.genai", "air", "numpy", "dotenv", "asyncio")
+
+_PROBE = """
+import sys
+sys.argv = ["runner.py", "--list-frameworks"]
+import runner
+runner.main()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print("HEAVY:" + ",".join(heavy))
+"""
+
+
+def _time_cmd(args: list[str], runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return times
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="CLI cold-start benchmark")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = ap.parse_args()
+
+    ok = True
+    baseline = statistics.median(_time_cmd(["-c", "pass"], args.runs))
+    print(f"{'python -c pass':<32} median={baseline:7.1f} ms")
+    for cmd in (["runner.py", "--help"], ["runner.py", "--list-frameworks"]):
+        med = statistics.median(_time_cmd(cmd, args.runs))
+        over = med > args.budget_ms
+        ok &= not over
+        print(f"{' '.join(cmd):<32} median={med:7.1f} ms  (+{med - baseline:.1f} ms over bare interpreter)"
+              f"{'  OVER BUDGET' if over else ''}")
+
+    probe = subprocess.run([sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)], cwd=ROOT,
+                           check=True, capture_output=True, text=True).stdout
+    heavy = [m for m in probe.rsplit("HEAVY:", 1)[-1].strip().split(",") if m]
+    if heavy:
+        ok = False
+        print(f"heavy modules imported at start-up: {', '.join(heavy)}")
+
+    print(f"budget {args.budget_ms:.0f} ms: {'PASS' if ok else 'FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Keyword-matching benchmark: plain `kw in text` checks vs the Aho-Corasick automaton.
+
+Times KeywordMatcher.all_present in both modes for growing keyword counts over one output
+text (half the keywords present, half absent) and reports where the automaton starts to win,
+i.e. where text_match.AUTOMATON_MIN_KEYWORDS should sit.
+
+    python benchmarks/text_match.py --text-kb 130 --runs 5
+"""
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from common.evaluators.text_match import AUTOMATON_MIN_KEYWORDS, KeywordMatcher  # noqa: E402
+
+DEFAULT_COUNTS = (1, 2, 10, 100, 300, 1000, 3000, 10000)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+
+
+def _time_ms(matcher: KeywordMatcher, text: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        matcher.all_present(text)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(times)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Keyword matcher benchmark")
+    ap.add_argument("--text-kb", type=int, default=130)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < args.text_kb * 1024:
+        words.append(_word(rng))
+    text = " ".join(words)
+
+    crossover = None
+    print(f"text={len(text) / 1024:.0f} KB, median of {args.runs} runs, AUTOMATON_MIN_KEYWORDS={AUTOMATON_MIN_KEYWORDS}")
+    print(f"{'keywords':>9} {'substring ms':>13} {'automaton ms':>13}")
+    for n in args.counts:
+        # half present (taken from the text), half absent (longer than any text word)
+        keywords = rng.sample(words, n // 2) + [_word(rng) + "zzzzz" for _ in range(n - n // 2)]
+        sub = _time_ms(KeywordMatcher(keywords, automaton=False), text, args.runs)
+        auto = _time_ms(KeywordMatcher(keywords, automaton=True), text, args.runs)
+        if crossover is None and auto < sub:
+            crossover = n
+        print(f"{n:>9} {sub:>13.3f} {auto:>13.3f}")
+    print(f"automaton faster from {crossover} keywords" if crossover else "substring checks faster at every count")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
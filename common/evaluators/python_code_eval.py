@@ -1,12 +1,21 @@
 from __future__ import annotations
 import re
-from multiprocessing import Process, Queue
-from typing import Any, Dict, List
+import atexit
+import multiprocessing as mp
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 import traceback
 import os
 
+from common.evaluators import text_match
+from common.utils import tracing
+
 # configurable default timeout (seconds)
 DEFAULT_TIMEOUT = float(os.getenv("AE_PY_EXEC_TIMEOUT", "8.0"))
+# number of pre-forked sandbox workers (defaults to the number of cores)
+DEFAULT_WORKERS = int(os.getenv("AE_PY_EXEC_WORKERS", "0")) or (os.cpu_count() or 1)
 
 _CODE_BLOCK_RE = re.compile(r"```(?:python)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
 
@@ -16,51 +25,166 @@ def _extract_code_block(text: str) -> str:
         return m.group(1).strip()
     return text.strip()
 
-def _exec_worker(code: str, q: Queue):
+_ALLOWED_BUILTINS = {
+    "print": print, "range": range, "len": len, "int": int, "str": str,
+    "list": list, "tuple": tuple, "dict": dict, "enumerate": enumerate,
+    "sum": sum, "min": min, "max": max, "abs": abs,
+}
+_FORBIDDEN = [
+    r"__import__", r"\bimport\b", r"\bopen\s*\(", r"\bexec\s*\(",
+    r"\beval\s*\(", r"\bos\.", r"\bsys\.", r"\bsubprocess\b", r"\bsocket\b",
+    r"\brequests\b", r"\bshutil\b", r"\bpickle\b", r"\bctypes\b",
+]
+
+def _forbidden_pattern(code: str) -> Optional[str]:
+    # one combined regex screens the code; the reported rule is the first in _FORBIDDEN that matches
+    return text_match.rule_set(tuple(_FORBIDDEN)).first(code)
+
+def _exec_sandboxed(code: str) -> Dict[str, Any]:
     """Run untrusted code with a tiny builtin whitelist; no imports allowed."""
-    import io, contextlib, types, re
+    import io, contextlib, types
 
-    allowed_builtins = {
-        "print": print, "range": range, "len": len, "int": int, "str": str,
-        "list": list, "tuple": tuple, "dict": dict, "enumerate": enumerate,
-        "sum": sum, "min": min, "max": max, "abs": abs,
-    }
-    forbidden = [
-        r"__import__", r"\bimport\b", r"\bopen\s*\(", r"\bexec\s*\(",
-        r"\beval\s*\(", r"\bos\.", r"\bsys\.", r"\bsubprocess\b", r"\bsocket\b",
-        r"\brequests\b", r"\bshutil\b", r"\bpickle\b", r"\bctypes\b",
-    ]
-    for pat in forbidden:
-        if re.search(pat, code):
-            q.put({"ok": False, "error": f"Forbidden pattern: {pat}", "stdout": ""})
-            return
+    pat = _forbidden_pattern(code)
+    if pat is not None:
+        return {"ok": False, "error": f"Forbidden pattern: {pat}", "stdout": ""}
 
     stdout = io.StringIO()
     try:
-        sandbox_globals = {"__builtins__": types.MappingProxyType(allowed_builtins)}
+        sandbox_globals = {"__builtins__": types.MappingProxyType(_ALLOWED_BUILTINS)}
         with contextlib.redirect_stdout(stdout):
             exec(compile(code, "<sandbox>", "exec"), sandbox_globals, {})
-        q.put({"ok": True, "error": None, "stdout": stdout.getvalue()})
+        return {"ok": True, "error": None, "stdout": stdout.getvalue()}
     except Exception:
-        q.put({"ok": False, "error": "".join(traceback.format_exc()), "stdout": stdout.getvalue()})
+        return {"ok": False, "error": "".join(traceback.format_exc()), "stdout": stdout.getvalue()}
 
-def _run_code_with_timeout(code: str, timeout_s: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
-    q: Queue = Queue(maxsize=1)
-    p = Process(target=_exec_worker, args=(code, q))
-    p.start()
-    p.join(timeout=timeout_s)
-    if p.is_alive():
-        p.terminate()
-        p.join(0.2)
-        return {"ok": False, "error": "Timeout", "stdout": ""}
-    if q.empty():
+def _pool_worker_loop(conn) -> None:
+    """Long-lived sandbox worker: receive code over `conn`, send back results until told to stop."""
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:
+            return
+        if code is None:
+            return
+        conn.send(_exec_sandboxed(code))
+
+
+def _mp_context():
+    # forkserver keeps fresh sandbox processes cheap and is safe in a threaded harness
+    method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    return mp.get_context(method)
+
+
+class _SandboxWorker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_pool_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, code: str, timeout_s: float) -> Optional[Dict[str, Any]]:
+        """Return the sandbox result, or None if the worker timed out or died."""
+        try:
+            self.conn.send(code)
+            if not self.conn.poll(timeout_s):
+                return None
+            return self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            return None
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(0.2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(0.2)
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(0.2)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of pre-forked sandbox workers.
+
+    Workers are started once and reused across jobs; a worker that times out (or dies)
+    is killed and replaced so the next job always gets a clean, responsive process.
+    """
+
+    def __init__(self, size: int = DEFAULT_WORKERS):
+        self.size = max(1, int(size))
+        self._ctx = _mp_context()
+        self._idle: "queue.Queue[_SandboxWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: List[_SandboxWorker] = []
+        for _ in range(self.size):
+            self._add_worker()
+
+    def _add_worker(self) -> None:
+        w = _SandboxWorker(self._ctx)
+        with self._lock:
+            self._workers.append(w)
+        self._idle.put(w)
+
+    def _retire(self, w: _SandboxWorker) -> None:
+        with self._lock:
+            if w in self._workers:
+                self._workers.remove(w)
+        w.kill()
+
+    def run(self, code: str, timeout_s: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        with tracing.span("sandbox_wait", cat="sandbox"):
+            w = self._idle.get()
+        with tracing.span("sandbox_run", cat="sandbox", pid=w.process.pid):
+            res = w.run(code, timeout_s)
+        if res is not None:
+            self._idle.put(w)
+            return res
+
+        timed_out = w.process.is_alive()
+        self._retire(w)
+        self._add_worker()
+        if timed_out:
+            return {"ok": False, "error": "Timeout", "stdout": ""}
         return {"ok": False, "error": "No result from sandbox", "stdout": ""}
-    return q.get()
 
-def evaluate_code_output(model_output: str, expected_sequence: List[int], timeout_s: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
-    """Extract code, execute, parse stdout ints, compare to expected."""
-    code = _extract_code_block(model_output)
-    res = _run_code_with_timeout(code, timeout_s=timeout_s)
+    def map(self, codes: List[str], timeout_s: float = DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+        """Run many snippets, fanning out across all workers; results keep input order."""
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            return list(ex.map(lambda c: self.run(c, timeout_s), codes))
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for w in workers:
+            w.close()
+
+
+_POOL: Optional[SandboxPool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool() -> SandboxPool:
+    """Return the process-wide sandbox pool, starting it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SandboxPool()
+            atexit.register(_POOL.close)
+        return _POOL
+
+def _run_code_with_timeout(code: str, timeout_s: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    return get_pool().run(code, timeout_s=timeout_s)
+
+def _compare_stdout(res: Dict[str, Any], expected_sequence: List[int]) -> Dict[str, Any]:
     if not res.get("ok"):
         return {"ok": False, "reason": f"Execution error: {res.get('error')}", "got": [], "expected": expected_sequence, "stdout": res.get("stdout", "")}
 
@@ -73,3 +197,151 @@ def evaluate_code_output(model_output: str, expected_sequence: List[int], timeou
         "expected": expected_sequence,
         "stdout": res.get("stdout", "")
     }
+
+def evaluate_code_output(model_output: str, expected_sequence: List[int], timeout_s: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Extract code, execute, parse stdout ints, compare to expected."""
+    code = _extract_code_block(model_output)
+    res = _run_code_with_timeout(code, timeout_s=timeout_s)
+    return _compare_stdout(res, expected_sequence)
+
+def evaluate_code_outputs(model_outputs: List[str], expected_sequence: List[int], timeout_s: float = DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+    """Batch version of evaluate_code_output; snippets run in parallel on the sandbox pool."""
+    codes = [_extract_code_block(o) for o in model_outputs]
+    results = get_pool().map(codes, timeout_s=timeout_s)
+    return [_compare_stdout(r, expected_sequence) for r in results]
+
+
+# --- resource profiling (code_efficiency) -----------------------------------
+
+# rlimits for profiling runs: CPU seconds per input size and address space in MB
+DEFAULT_CPU_LIMIT = float(os.getenv("AE_PY_EXEC_CPU_LIMIT", str(DEFAULT_TIMEOUT)))
+DEFAULT_MEM_LIMIT_MB = int(os.getenv("AE_PY_EXEC_MEM_MB", "1024"))
+# keep calling a fast entrypoint until this much CPU time has accumulated, for a stable per-call figure
+_MIN_MEASURE_S = 0.05
+
+
+class _Discard:
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+def _profile_worker(code: str, entrypoint: str, size: int, cpu_s: float, mem_mb: int, conn) -> None:
+    """One-shot child: apply rlimits, define the code, time entrypoint(size)."""
+    import contextlib, resource, time, types
+
+    def _cpu() -> float:
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return ru.ru_utime + ru.ru_stime
+
+    try:
+        limit = max(1, int(cpu_s + 0.999))
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+        if mem_mb:
+            resource.setrlimit(resource.RLIMIT_AS, (mem_mb * 1024 * 1024, mem_mb * 1024 * 1024))
+        # one namespace, so recursive functions can see themselves
+        namespace = {"__builtins__": types.MappingProxyType(_ALLOWED_BUILTINS)}
+        with contextlib.redirect_stdout(_Discard()):
+            exec(compile(code, "<sandbox>", "exec"), namespace)
+            fn = namespace.get(entrypoint)
+            if not callable(fn):
+                conn.send({"ok": False, "error": f"entrypoint '{entrypoint}' is not defined"})
+                return
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            calls, c0, w0 = 0, _cpu(), time.perf_counter()
+            while True:
+                fn(size)
+                calls += 1
+                if _cpu() - c0 >= _MIN_MEASURE_S or calls >= 100000:
+                    break
+            cpu, wall = _cpu() - c0, time.perf_counter() - w0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+        conn.send({"ok": True, "size": size, "calls": calls, "cpu_s": cpu / calls, "wall_s": wall / calls,
+                   "peak_rss_kb": peak, "rss_growth_kb": max(0, peak - rss_before)})
+    except MemoryError:
+        conn.send({"ok": False, "error": f"address-space limit ({mem_mb} MB) exceeded", "limit": "memory"})
+    except Exception:
+        conn.send({"ok": False, "error": traceback.format_exc(limit=3)})
+
+
+def _fit_exponent(sizes: List[float], values: List[float]) -> Dict[str, Optional[float]]:
+    """Least-squares slope of log(value) vs log(size): ~1 for linear, ~2 for quadratic, large for exponential."""
+    import math
+    pts = [(math.log(s), math.log(v)) for s, v in zip(sizes, values) if s > 0 and v > 0]
+    if len(pts) < 2:
+        return {"exponent": None, "r2": None}
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    sxx = sum((x - mx) ** 2 for x, _ in pts)
+    sxy = sum((x - mx) * (y - my) for x, y in pts)
+    syy = sum((y - my) ** 2 for _, y in pts)
+    if sxx == 0:
+        return {"exponent": None, "r2": None}
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 1.0
+    return {"exponent": slope, "r2": r2}
+
+
+def _profile_size(ctx, code: str, entrypoint: str, size: int, cpu_s: float, mem_mb: int) -> Dict[str, Any]:
+    parent, child = ctx.Pipe(duplex=False)
+    p = ctx.Process(target=_profile_worker, args=(code, entrypoint, size, cpu_s, mem_mb, child), daemon=True)
+    p.start()
+    child.close()
+    # generous wall allowance: the CPU rlimit is what bounds the run
+    try:
+        res = parent.recv() if parent.poll(cpu_s * 2 + 5) else None
+    except EOFError:
+        res = None  # killed by an rlimit before it could report
+    p.join(0.5)
+    if p.is_alive():
+        p.kill()
+        p.join(0.5)
+    parent.close()
+    if res is None:
+        if p.exitcode in (-24, -9):
+            res = {"ok": False, "error": f"CPU/time limit ({cpu_s:g}s) exceeded", "limit": "cpu"}
+        else:
+            res = {"ok": False, "error": f"sandbox exited with code {p.exitcode}"}
+    return res
+
+
+def profile_code(code: str, entrypoint: str, sizes: List[int], cpu_s: float = DEFAULT_CPU_LIMIT,
+                 mem_mb: int = DEFAULT_MEM_LIMIT_MB) -> Dict[str, Any]:
+    """
+    Run `entrypoint(n)` from the sandboxed `code` at each input size, one fresh process per size
+    (so peak RSS isn't inherited from a previous size), under CPU-time and address-space rlimits.
+
+    Returns per-size CPU time, wall time and peak RSS, plus the log-log scaling exponent of CPU
+    time with size. Sizes past the first failure (e.g. the CPU limit) are not attempted;
+    `limit_hit` ("cpu" / "memory") and `limit_size` say which rlimit stopped the run, and where.
+    """
+    pat = _forbidden_pattern(code)
+    if pat is not None:
+        return {"ok": False, "error": f"Forbidden pattern: {pat}", "runs": [], "limit_hit": None, "limit_size": None}
+    ctx = _mp_context()
+    runs: List[Dict[str, Any]] = []
+    error = limit_hit = limit_size = None
+    for size in sorted(sizes):
+        with tracing.span("sandbox_profile", cat="sandbox", size=size):
+            res = _profile_size(ctx, code, entrypoint, size, cpu_s, mem_mb)
+        if not res.get("ok"):
+            error = f"size {size}: {res['error']}"
+            limit_hit = res.get("limit")
+            limit_size = size if limit_hit else None
+            break
+        runs.append({k: v for k, v in res.items() if k != "ok"})
+
+    fit = _fit_exponent([r["size"] for r in runs], [r["cpu_s"] for r in runs])
+    return {
+        "ok": error is None,
+        "error": error,
+        "entrypoint": entrypoint,
+        "runs": runs,
+        "scaling_exponent": fit["exponent"],
+        "fit_r2": fit["r2"],
+        "peak_rss_kb": max((r["peak_rss_kb"] for r in runs), default=None),
+        "limit_hit": limit_hit,
+        "limit_size": limit_size,
+    }
@@ -1,11 +1,18 @@
 import re
 from typing import List, Dict, Any
 
-def evaluate(output: str, expected_sequence: List[int]) -> Dict[str, Any]:
-    got = [int(x) for x in re.findall(r"-?\d+", output)]
+_INT_RE = re.compile(r"-?\d+")
+
+def parse_ints(output: str) -> List[int]:
+    return [int(x) for x in _INT_RE.findall(output)]
+
+def evaluate_ints(got: List[int], expected_sequence: List[int]) -> Dict[str, Any]:
     return {
         "ok": got == expected_sequence,
         "got": got,
         "expected": expected_sequence,
         "reason": "" if got == expected_sequence else "Mismatch"
     }
+
+def evaluate(output: str, expected_sequence: List[int]) -> Dict[str, Any]:
+    return evaluate_ints(parse_ints(output), expected_sequence)
@@ -0,0 +1,194 @@
+"""
+Precompiled multi-pattern matching for scoring: keyword lists and regex rule sets.
+
+  KeywordMatcher - literal keywords; short lists use plain `kw in text` checks (C speed), long
+                   ones an Aho-Corasick automaton that finds every keyword in one pass
+  RuleSet        - regex rules combined into one alternation of named groups; `search` reports
+                   which rule fired via `match.lastgroup`, `first` the first rule in list order
+
+Both take `ignore_case`; KeywordMatcher also takes `normalized`, which compares normalized text
+(case-folded, accents stripped, runs of punctuation/whitespace collapsed to one space), so
+the keyword "Space-X" also finds "space x" and "SPACE_X". This is normalization, not fuzzy
+(edit-distance) matching: a misspelled keyword still doesn't match. Use `keyword_matcher` /
+`rule_set` to get instances cached by their pattern lists, i.e. built once per case, and
+`*_many` to score a batch of outputs with the same compiled matcher.
+"""
+from __future__ import annotations
+import re
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+# a rule's leading global flags, e.g. "(?i)", become scoped flags "(?i:...)" inside the alternation
+_GLOBAL_FLAGS_RE = re.compile(r"^\(\?([aimsux]+)\)")
+# numbered backreferences would point at the wrong group once rules are combined
+_NUMBERED_BACKREF_RE = re.compile(r"\\[1-9]|\(\?\(\d")
+# below this many keywords one `in` check per keyword beats the pure-Python automaton
+# (see benchmarks/text_match.py)
+AUTOMATON_MIN_KEYWORDS = 500
+
+
+def normalize(text: str) -> str:
+    """`text` case-folded, without accents, with punctuation and whitespace runs as one space."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", stripped).strip()
+
+
+class KeywordMatcher:
+    """
+    Matcher for a fixed set of literal keywords.
+
+    `automaton` forces (True) or disables (False) the Aho-Corasick automaton; by default it is
+    used from AUTOMATON_MIN_KEYWORDS keywords on.
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False, normalized: bool = False,
+                 automaton: Optional[bool] = None):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        self.ignore_case = ignore_case
+        self.normalized = normalized
+        self._prepped: Tuple[str, ...] = tuple(self._prep(kw) for kw in self.keywords)
+        self.automaton = len(self.keywords) >= AUTOMATON_MIN_KEYWORDS if automaton is None else automaton
+        # goto[state][char] -> state; out[state] -> keyword indices ending at state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        if self.automaton:
+            for idx, kw in enumerate(self._prepped):
+                self._add(kw, idx)
+            self._link()
+
+    def _prep(self, text: str) -> str:
+        if self.normalized:
+            return normalize(text)
+        return text.casefold() if self.ignore_case else text
+
+    def _add(self, word: str, idx: int) -> None:
+        if not word:
+            return  # an empty keyword is trivially present; handled in `found`
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (idx,)
+
+    def _link(self) -> None:
+        # breadth-first failure links; outputs of the failure state are merged in
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def found(self, text: str, stop_when_all: bool = True) -> Set[int]:
+        """Indices of the keywords occurring in `text`."""
+        text = self._prep(text or "")
+        if not self.automaton:
+            return {i for i, kw in enumerate(self._prepped) if kw in text}
+        hits = {i for i, kw in enumerate(self._prepped) if not kw}
+        want = len(self.keywords)
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+                if stop_when_all and len(hits) == want:
+                    break
+        return hits
+
+    def missing(self, text: str) -> List[str]:
+        hits = self.found(text)
+        return [kw for i, kw in enumerate(self.keywords) if i not in hits]
+
+    def all_present(self, text: str) -> bool:
+        return len(self.found(text)) == len(self.keywords)
+
+    def any_present(self, text: str) -> bool:
+        return bool(self.found(text))
+
+    def missing_many(self, texts: Sequence[str]) -> List[List[str]]:
+        """`missing` for each of `texts`, reusing the compiled automaton."""
+        return [self.missing(t) for t in texts]
+
+
+def _scoped(rule: str) -> str:
+    m = _GLOBAL_FLAGS_RE.match(rule)
+    return f"(?{m.group(1)}:{rule[m.end():]})" if m else rule
+
+
+class RuleSet:
+    """
+    Regex rules compiled into one alternation; group `r<i>` is rule i.
+
+    Rules that can't share the alternation (numbered backreferences, or a combined pattern
+    that won't compile, e.g. clashing group names) are matched one by one instead.
+    """
+
+    def __init__(self, rules: Iterable[str], ignore_case: bool = False):
+        self.rules: Tuple[str, ...] = tuple(dict.fromkeys(rules))
+        flags = re.IGNORECASE if ignore_case else 0
+        self._single = [re.compile(r, flags) for r in self.rules]
+        combinable = [i for i, r in enumerate(self.rules) if not _NUMBERED_BACKREF_RE.search(r)]
+        self._combined = None
+        if combinable:
+            try:
+                self._combined = re.compile("|".join(f"(?P<r{i}>{_scoped(self.rules[i])})" for i in combinable), flags)
+            except re.error:
+                combinable = []
+        self._separate = [i for i in range(len(self.rules)) if i not in set(combinable)]
+
+    def search(self, text: str) -> Optional[str]:
+        """The rule matching earliest in `text`, or None."""
+        text = text or ""
+        best: Optional[Tuple[int, int]] = None  # (start, rule index)
+        if self._combined is not None:
+            m = self._combined.search(text)
+            if m is not None:
+                best = (m.start(), int(m.lastgroup[1:]))
+        for i in self._separate:
+            m = self._single[i].search(text)
+            if m is not None and (best is None or (m.start(), i) < best):
+                best = (m.start(), i)
+        return None if best is None else self.rules[best[1]]
+
+    def first(self, text: str) -> Optional[str]:
+        """The first rule in list order that matches anywhere in `text`, or None."""
+        text = text or ""
+        m = self._combined.search(text) if self._combined is not None else None
+        if m is None:
+            # no combinable rule matches; only the separately matched ones can
+            return next((self.rules[i] for i in self._separate if self._single[i].search(text)), None)
+        hit = int(m.lastgroup[1:])
+        # an earlier rule may still match further into the text
+        earlier = next((self.rules[i] for i in range(hit) if self._single[i].search(text)), None)
+        return earlier or self.rules[hit]
+
+    def search_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        return [self.search(t) for t in texts]
+
+
+@lru_cache(maxsize=256)
+def keyword_matcher(keywords: Tuple[str, ...], ignore_case: bool = False, normalized: bool = False) -> KeywordMatcher:
+    return KeywordMatcher(keywords, ignore_case=ignore_case, normalized=normalized)
+
+
+@lru_cache(maxsize=256)
+def rule_set(rules: Tuple[str, ...], ignore_case: bool = False) -> RuleSet:
+    return RuleSet(rules, ignore_case=ignore_case)
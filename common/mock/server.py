@@ -0,0 +1,259 @@
+"""
+Local OpenAI-compatible mock LLM server for offline load tests of the harness.
+
+Serves POST .../chat/completions (streaming and non-streaming) and GET .../models with
+configurable latency distributions, streamed chunk timing, error rates and scripted
+responses (plain text, fenced code blocks, tool calls). See common/mock/scripts.yaml.
+
+    python -m common.mock.server --port 8911 [--config my_scripts.yaml]
+
+Point clients at http://127.0.0.1:8911/v1 (CrewAI: AE_CREWAI_BASE_URL, AI Refinery:
+AI_REFINERY_BASE_URL, the mock runner: AE_MOCK_BASE_URL).
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CONFIG = Path(__file__).parent / "scripts.yaml"
+
+
+def load_config(path: Path | str | None = None, overrides: dict | None = None) -> dict:
+    import yaml
+
+    with open(DEFAULT_CONFIG, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg.update(yaml.safe_load(f) or {})
+    cfg.update(overrides or {})
+    return cfg
+
+
+class Sampler:
+    """Draws delays from the configured distributions (thread-safe, seedable)."""
+
+    def __init__(self, seed: int | None = None):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, spec: dict | float | None) -> float:
+        if spec is None:
+            return 0.0
+        if isinstance(spec, (int, float)):
+            return float(spec)
+        dist = spec.get("dist", "fixed")
+        with self._lock:
+            r = self._rng
+            if dist == "fixed":
+                v = spec.get("value", 0.0)
+            elif dist == "uniform":
+                v = r.uniform(spec.get("low", 0.0), spec.get("high", 0.0))
+            elif dist == "normal":
+                v = r.gauss(spec.get("mean", 0.0), spec.get("sd", 0.0))
+            elif dist == "lognormal":
+                v = r.lognormvariate(math.log(spec.get("median", 0.1)), spec.get("sigma", 0.0))
+            elif dist == "exponential":
+                v = r.expovariate(1.0 / spec.get("mean", 0.1))
+            else:
+                raise ValueError(f"Unknown latency distribution '{dist}'")
+        return max(0.0, float(v))
+
+    def chance(self, p: float) -> bool:
+        with self._lock:
+            return self._rng.random() < p
+
+    def choice(self, items: List[Any]) -> Any:
+        with self._lock:
+            return self._rng.choice(items)
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockLLM:
+    """Response planning, independent of HTTP so it can be reused in-process."""
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.sampler = Sampler(config.get("seed"))
+        self.rules = [dict(r, _re=re.compile(r["match"])) for r in config.get("rules") or []]
+
+    def plan(self, body: dict) -> Tuple[Optional[str], Optional[List[dict]]]:
+        """Return (content, tool_calls) for a chat request."""
+        messages = body.get("messages") or []
+        last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if isinstance(last_user, list):  # content parts
+            last_user = " ".join(p.get("text", "") for p in last_user if isinstance(p, dict))
+        has_tool_result = any(m.get("role") == "tool" for m in messages)
+        for rule in self.rules:
+            m = rule["_re"].search(last_user)
+            if not m:
+                continue
+            if rule.get("tool_calls") and not has_tool_result:
+                calls = [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": c["name"], "arguments": json.dumps(c.get("arguments") or {})},
+                } for c in rule["tool_calls"]]
+                return None, calls
+            return m.expand(rule.get("response", "")), None
+        return self.config.get("default_response", ""), None
+
+    def error_status(self) -> Optional[int]:
+        errs = self.config.get("errors") or {}
+        if errs.get("rate") and self.sampler.chance(errs["rate"]):
+            return int(self.sampler.choice(errs.get("statuses") or [500]))
+        return None
+
+    def completion(self, body: dict, content: Optional[str], tool_calls: Optional[List[dict]]) -> dict:
+        prompt_text = json.dumps(body.get("messages") or [])
+        completion_tokens = _approx_tokens(content or json.dumps(tool_calls))
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:16]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if tool_calls else "stop"}],
+            "usage": {"prompt_tokens": _approx_tokens(prompt_text), "completion_tokens": completion_tokens,
+                      "total_tokens": _approx_tokens(prompt_text) + completion_tokens},
+        }
+
+    def chunks(self, body: dict, content: Optional[str], tool_calls: Optional[List[dict]]) -> Iterator[Tuple[float, dict]]:
+        """Yield (delay_before, chunk) pairs for a streamed response."""
+        cid = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+        base = {"id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "mock")}
+        first = True
+        if tool_calls:
+            delta = {"role": "assistant", "tool_calls": [dict(c, index=i) for i, c in enumerate(tool_calls)]}
+            yield 0.0, dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+            first = False
+        text = content or ""
+        step = max(1, int(self.config.get("chunk_chars", 12)))
+        for i in range(0, len(text), step):
+            delay = 0.0 if first else self.sampler.delay(self.config.get("chunk_interval"))
+            delta = {"content": text[i:i + step]}
+            if first:
+                delta["role"] = "assistant"
+            first = False
+            yield delay, dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+        full = self.completion(body, content, tool_calls)
+        yield 0.0, dict(base, choices=[{"index": 0, "delta": {},
+                                        "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                        usage=full["usage"])
+
+
+def _make_handler(llm: MockLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real provider
+
+        def log_message(self, *args) -> None:  # quiet
+            pass
+
+        def _json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                self._json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+            else:
+                self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._json(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(llm.sampler.delay(llm.config.get("latency")))
+            status = llm.error_status()
+            if status is not None:
+                headers = {}
+                if status in (429, 503):
+                    headers["Retry-After"] = str(llm.config.get("errors", {}).get("retry_after", 1))
+                self._json(status, {"error": {"message": f"mock error {status}", "type": "mock_error",
+                                              "code": status}}, headers)
+                return
+
+            content, tool_calls = llm.plan(body)
+            if not body.get("stream"):
+                self._json(200, llm.completion(body, content, tool_calls))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for delay, chunk in llm.chunks(body, content, tool_calls):
+                if delay:
+                    time.sleep(delay)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def start_server(config: dict | None = None, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock server on a daemon thread; port 0 picks a free port (see server.server_address)."""
+    llm = MockLLM(config if config is not None else load_config())
+    server = ThreadingHTTPServer((host, port), _make_handler(llm))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="ae-mock-llm", daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible mock LLM server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8911)
+    ap.add_argument("--config", default=None, help="YAML overriding common/mock/scripts.yaml")
+    ap.add_argument("--error-rate", type=float, default=None)
+    ap.add_argument("--latency", type=float, default=None, help="Fixed time to first token (s)")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    if args.error_rate is not None:
+        cfg.setdefault("errors", {})["rate"] = args.error_rate
+    if args.latency is not None:
+        cfg["latency"] = args.latency
+    server = start_server(cfg, args.host, args.port)
+    print(f"mock LLM listening on {base_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
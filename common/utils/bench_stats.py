@@ -0,0 +1,202 @@
+from __future__ import annotations
+import math
+from collections import defaultdict
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+CONFIDENCE = 0.95
+# metrics scored 0/1 per run: summarized as success rates (Wilson CI, two-proportion z-test),
+# everything else as a continuous distribution, whatever values a sample happens to hold
+RATE_METRICS = frozenset({"functional_correctness", "sequence_correctness", "success_keywords", "tool_usage",
+                          "code_efficiency_limited"})
+
+
+# --- distributions (no scipy dependency) ------------------------------------
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # continued fraction for the regularized incomplete beta (Numerical Recipes)
+    tiny, eps = 1e-300, 3e-14
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < eps:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    lbeta = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+    front = math.exp(lbeta + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_sf2(t: float, df: float) -> float:
+    """Two-sided p-value of Student's t."""
+    if not math.isfinite(t):
+        return 0.0
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_ppf(q: float, df: float) -> float:
+    """Quantile of Student's t (bisection on the CDF; fine for CI widths)."""
+    target = 2.0 * (1.0 - q)  # two-sided tail mass
+    lo, hi = 0.0, 1e3
+    for _ in range(100):
+        mid = (lo + hi) / 2.0
+        if t_sf2(mid, df) > target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+
+def _norm_sf2(z: float) -> float:
+    return math.erfc(abs(z) / math.sqrt(2.0))
+
+
+# --- summaries --------------------------------------------------------------
+
+def wilson_interval(successes: float, n: int, confidence: float = CONFIDENCE) -> Tuple[float, float]:
+    if n == 0:
+        return (0.0, 1.0)
+    z = math.sqrt(2.0) * _erfinv(confidence)
+    p = successes / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def _erfinv(y: float) -> float:
+    # Newton iterations on erf; only used for a handful of confidence levels
+    x = 0.0
+    for _ in range(50):
+        x -= (math.erf(x) - y) / (2.0 / math.sqrt(math.pi) * math.exp(-x * x))
+    return x
+
+
+def describe(values: np.ndarray, rate: bool = False, confidence: float = CONFIDENCE) -> Dict[str, Any]:
+    """Percentiles and mean ± CI for a continuous metric; success rate + Wilson CI for a rate metric."""
+    n = int(values.size)
+    if rate:
+        k = float(values.sum())
+        lo, hi = wilson_interval(k, n, confidence)
+        return {"n": n, "kind": "rate", "rate": k / n if n else 0.0, "ci": [lo, hi]}
+
+    mean = float(values.mean())
+    sd = float(values.std(ddof=1)) if n > 1 else 0.0
+    half = t_ppf(0.5 + confidence / 2.0, n - 1) * sd / math.sqrt(n) if n > 1 else float("nan")
+    pct = np.percentile(values, PERCENTILES)
+    out = {"n": n, "kind": "continuous", "mean": mean, "sd": sd, "ci": [mean - half, mean + half]}
+    out.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, pct)})
+    return out
+
+
+def compare(a: np.ndarray, b: np.ndarray, rate: bool = False) -> Dict[str, Any]:
+    """Welch's t-test for continuous metrics, two-proportion z-test for rate metrics."""
+    na, nb = a.size, b.size
+    if na < 2 or nb < 2:
+        return {"test": None, "p_value": None}
+    if rate:
+        pa, pb = a.mean(), b.mean()
+        pooled = (a.sum() + b.sum()) / (na + nb)
+        se = math.sqrt(pooled * (1 - pooled) * (1 / na + 1 / nb))
+        p = 1.0 if se == 0 else _norm_sf2((pa - pb) / se)
+        return {"test": "two_proportion_z", "diff": float(pa - pb), "p_value": float(p)}
+    va, vb = a.var(ddof=1) / na, b.var(ddof=1) / nb
+    if va + vb == 0:
+        p = 1.0 if a.mean() == b.mean() else 0.0
+        return {"test": "welch_t", "diff": float(a.mean() - b.mean()), "p_value": p}
+    t = (a.mean() - b.mean()) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (na - 1) + vb ** 2 / (nb - 1))
+    return {"test": "welch_t", "diff": float(a.mean() - b.mean()), "p_value": float(t_sf2(float(t), df))}
+
+
+def _numeric_metrics(metrics: dict) -> Dict[str, float]:
+    out = {k: float(v) for k, v in metrics.items()
+           if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    # the latency breakdown is reported as its own distributions too
+    bd = metrics.get("latency_breakdown") or {}
+    for k in ("construction_s", "agent_build_s", "first_event_s", "final_response_s"):
+        if isinstance(bd.get(k), (int, float)):
+            out[f"latency.{k}"] = float(bd[k])
+    # runs on cached agents are steady state; runs that had to build one include cold-start cost
+    if bd.get("agent_cached") is not None and isinstance(metrics.get("latency"), (int, float)):
+        out["latency.steady" if bd["agent_cached"] else "latency.cold"] = float(metrics["latency"])
+    return out
+
+
+def summarize(results: List[dict], alpha: float = 1.0 - CONFIDENCE) -> Dict[str, Any]:
+    """
+    Aggregate repeated trials per (case, framework) and compare frameworks per case.
+
+    Returns {"cells": {(case, fw): {metric: stats}}, "comparisons": [...]}; comparisons with
+    p_value >= alpha are flagged not significant.
+    """
+    samples: Dict[Tuple[str, str], Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for r in results:
+        for name, value in _numeric_metrics(r.get("metrics") or {}).items():
+            samples[(r["case"], r["framework"])][name].append(value)
+
+    arrays = {cell: {m: np.asarray(v, dtype=float) for m, v in ms.items()} for cell, ms in samples.items()}
+    cells = {cell: {m: describe(v, rate=m in RATE_METRICS) for m, v in ms.items()} for cell, ms in arrays.items()}
+
+    comparisons = []
+    by_case: Dict[str, List[str]] = defaultdict(list)
+    for case_name, fw in arrays:
+        by_case[case_name].append(fw)
+    for case_name, fws in by_case.items():
+        for fa, fb in combinations(fws, 2):
+            a, b = arrays[(case_name, fa)], arrays[(case_name, fb)]
+            for m in sorted(set(a) & set(b)):
+                res = compare(a[m], b[m], rate=m in RATE_METRICS)
+                if res["p_value"] is None:
+                    continue
+                res.update(case=case_name, a=fa, b=fb, metric=m, significant=res["p_value"] < alpha)
+                comparisons.append(res)
+    return {"cells": cells, "comparisons": comparisons}
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    lines = []
+    for (case_name, fw), ms in summary["cells"].items():
+        lines.append(f"\n=== BENCH: {case_name} | {fw} ===")
+        for m, st in sorted(ms.items()):
+            if st["kind"] == "rate":
+                lines.append(f"  {m:<28} rate={st['rate']:.3f}  95% CI [{st['ci'][0]:.3f}, {st['ci'][1]:.3f}]  n={st['n']}")
+            else:
+                half = (st["ci"][1] - st["ci"][0]) / 2.0
+                lines.append(f"  {m:<28} mean={st['mean']:.4f} ± {half:.4f}  p50={st['p50']:.4f}  "
+                             f"p90={st['p90']:.4f}  p99={st['p99']:.4f}  n={st['n']}")
+    if summary["comparisons"]:
+        lines.append("\n=== FRAMEWORK COMPARISONS ===")
+        for c in summary["comparisons"]:
+            flag = "" if c["significant"] else "  (not significant)"
+            lines.append(f"  {c['case']}: {c['a']} vs {c['b']} on {c['metric']}: "
+                         f"diff={c['diff']:+.4f} p={c['p_value']:.3g} [{c['test']}]{flag}")
+    return "\n".join(lines)
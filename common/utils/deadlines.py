@@ -0,0 +1,98 @@
+"""
+Per-cell deadlines and hedged requests for runner calls.
+
+`call(factory, ...)` awaits one runner call on the shared loop. With a timeout the call is
+cancelled (and so are the tasks underneath it) when the deadline passes. With hedging, a
+duplicate call is fired once the first one has run longer than the observed p95 for the
+same framework/model, and whichever finishes first wins; the loser is cancelled.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from common.utils import timing
+
+HEDGE_QUANTILE = 0.95
+MIN_SAMPLES = 10  # don't hedge on a p95 estimated from a handful of calls
+
+
+class LatencyTracker:
+    """Rolling window of call latencies per key (e.g. 'crewai|gpt-4o')."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def quantile(self, key: str, q: float = HEDGE_QUANTILE) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+TRACKER = LatencyTracker()
+
+
+async def _hedged(factory: Callable[[], Awaitable[Any]], delay: float) -> Tuple[Any, Dict[str, Any]]:
+    primary = asyncio.ensure_future(factory())
+    tasks = {primary: "primary"}
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result(), {"fired": False, "after_s": delay}
+        timing.mark(timing.HEDGE, after_s=delay)
+        tasks[asyncio.ensure_future(factory())] = "hedge"
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # a failed copy only loses if the other one can still succeed
+                if task.exception() is None or not pending:
+                    return task.result(), {"fired": True, "after_s": delay, "winner": tasks[task]}
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def call(factory: Callable[[], Awaitable[Any]], key: str, timeout: float | None = None,
+               hedge: bool = False) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Await `factory()` with an optional deadline and hedging; returns (result, hedge outcome).
+
+    Raises asyncio.TimeoutError when the deadline passes; the in-flight call(s) are cancelled.
+    """
+    t0 = time.perf_counter()
+    delay = TRACKER.quantile(key) if hedge else None
+
+    async def _run():
+        if delay is None:
+            return await factory(), ({"fired": False, "after_s": None} if hedge else None)
+        return await _hedged(factory, delay)
+
+    try:
+        result, outcome = await asyncio.wait_for(_run(), timeout) if timeout is not None else await _run()
+    except asyncio.TimeoutError:
+        timing.mark(timing.DEADLINE, timeout_s=timeout)
+        raise
+    TRACKER.observe(key, time.perf_counter() - t0)
+    return result, outcome
+
+
+def summarize_hedges(results: list[dict]) -> Dict[str, Any]:
+    """How often hedges fired and how often the duplicate won, over sweep results."""
+    outcomes = [r["hedge"] for r in results if r.get("hedge")]
+    fired = [o for o in outcomes if o.get("fired")]
+    return {
+        "calls": len(outcomes),
+        "fired": len(fired),
+        "hedge_won": sum(1 for o in fired if o.get("winner") == "hedge"),
+    }
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_THREAD: Optional[threading.Thread] = None
+_LOCK = threading.Lock()
+_EXECUTOR_WORKERS = 0
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    The harness-wide event loop, running forever on a daemon thread.
+
+    Every async runner call goes through this one loop so SDK clients, HTTP connection
+    pools and session services created on it stay usable across cases and repetitions.
+    """
+    global _LOOP, _THREAD
+    with _LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _THREAD = threading.Thread(target=_serve, name="ae-event-loop", daemon=True)
+            _THREAD.start()
+            ready.wait()
+            _LOOP = loop
+        return _LOOP
+
+
+def ensure_executor_workers(workers: int) -> None:
+    """
+    Size the loop's default executor (used by asyncio.to_thread, e.g. blocking SDK calls) for at
+    least `workers` concurrent calls, so the harness isn't what caps a sweep's or load test's concurrency.
+    """
+    global _EXECUTOR_WORKERS
+    loop = get_loop()
+    with _LOCK:
+        if workers <= _EXECUTOR_WORKERS:
+            return
+        _EXECUTOR_WORKERS = workers
+    loop.call_soon_threadsafe(loop.set_default_executor,
+                              concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ae-to-thread"))
+
+
+def submit(coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+    """
+    Schedule `coro` on the shared loop from any thread.
+
+    Unlike asyncio.run_coroutine_threadsafe, the task runs in a copy of the *caller's*
+    context, so context-local state (e.g. the timing timeline) follows the call.
+    """
+    loop = get_loop()
+    ctx = contextvars.copy_context()
+    fut: concurrent.futures.Future = concurrent.futures.Future()
+
+    def _start() -> None:
+        if not fut.set_running_or_notify_cancel():
+            coro.close()
+            return
+        task = loop.create_task(coro, context=ctx)
+
+        def _done(t: asyncio.Task) -> None:
+            if t.cancelled():
+                fut.set_exception(concurrent.futures.CancelledError())
+            elif t.exception() is not None:
+                fut.set_exception(t.exception())
+            else:
+                fut.set_result(t.result())
+
+        task.add_done_callback(_done)
+
+    loop.call_soon_threadsafe(_start)
+    return fut
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Block the calling thread until `coro` finishes on the shared loop."""
+    if _THREAD is not None and threading.current_thread() is _THREAD:
+        raise RuntimeError("run_sync() called from the shared event loop; await the coroutine instead")
+    return submit(coro).result()
+
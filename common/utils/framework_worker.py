@@ -0,0 +1,216 @@
+"""
+Long-lived worker subprocesses, one per framework (`--isolate`).
+
+Each framework runner lives in its own interpreter: SDK imports, clients, session services and
+telemetry globals stay warm across cells without leaking into other frameworks, frameworks get
+their own cores, and an SDK that segfaults or wedges takes down only its worker, which is
+restarted for the next cell.
+
+Protocol (pickled tuples over a multiprocessing Pipe):
+  parent -> worker  ("call", id, kind, system_prompt, user_prompt, model, temperature, timeout, hedge)
+                    ("stop",)
+  worker -> parent  ("ok", id, record)    record as returned by runner._call_runner
+                    ("err", id, exc_type, message, traceback_text)
+"""
+from __future__ import annotations
+import atexit
+import itertools
+import multiprocessing as mp
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class WorkerCrashed(RuntimeError):
+    """The framework worker process died (or stopped answering) while a call was in flight."""
+
+
+class RemoteError(RuntimeError):
+    """A runner call raised inside the worker; carries the remote exception type and traceback."""
+
+    def __init__(self, exc_type: str, message: str, remote_traceback: str):
+        super().__init__(f"{exc_type}: {message}")
+        self.exc_type = exc_type
+        self.remote_traceback = remote_traceback
+
+
+def _serve(framework: str, conn, setup: Dict[str, Any]) -> None:
+    """Worker process entry point: build nothing up front, answer calls until told to stop."""
+    import runner  # the harness module; its runner cache keeps the framework warm in this process
+    from common.utils import event_loop, rate_limit
+
+    for spec in setup.get("rate_limits") or []:
+        key, options = rate_limit.parse_spec(spec)
+        rate_limit.configure(key, **options)
+    if setup.get("executor_workers"):
+        event_loop.ensure_executor_workers(setup["executor_workers"])
+
+    send_lock = threading.Lock()
+
+    def send(msg) -> None:
+        with send_lock:
+            conn.send(msg)
+
+    def handle(msg) -> None:
+        _, req_id, kind, system_prompt, user_prompt, model, temperature, timeout, hedge = msg
+        try:
+            record = runner._call_runner(kind, framework, system_prompt, user_prompt, model, temperature,
+                                         timeout=timeout, hedge=hedge)
+            send(("ok", req_id, record))
+        except BaseException as e:
+            send(("err", req_id, type(e).__name__, str(e), traceback.format_exc()))
+
+    # cells for the same framework may overlap; each is served on its own thread
+    with ThreadPoolExecutor(max_workers=setup.get("max_calls") or 64, thread_name_prefix=f"ae-{framework}") as pool:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            if msg[0] == "stop":
+                return
+            pool.submit(handle, msg)
+
+
+class FrameworkWorker:
+    """Parent-side handle of one framework's worker process; safe to call from many threads."""
+
+    def __init__(self, framework: str, setup: Dict[str, Any] | None = None):
+        self.framework = framework
+        self.setup = setup or {}
+        self._ctx = mp.get_context("spawn")  # a clean interpreter: nothing inherited from the harness
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._process = None
+        self._conn = None
+        self._closing = False
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Start the worker process now (so it imports its SDK while others do) unless it is running."""
+        with self._lock:
+            if self._process is None:
+                self._start()
+
+    def _start(self) -> None:
+        parent, child = self._ctx.Pipe()
+        self._process = self._ctx.Process(target=_serve, args=(self.framework, child, self.setup),
+                                          name=f"ae-worker-{self.framework}", daemon=True)
+        self._process.start()
+        child.close()
+        self._conn = parent
+        threading.Thread(target=self._read, args=(parent,), name=f"ae-worker-{self.framework}-reader",
+                         daemon=True).start()
+
+    def _read(self, conn) -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                fut = self._pending.pop(msg[1], None)
+            if fut is None:
+                continue
+            if msg[0] == "ok":
+                fut.set_result(msg[2])
+            else:
+                fut.set_exception(RemoteError(*msg[2:]))
+        self._fail_pending(conn)
+
+    def _fail_pending(self, conn) -> None:
+        with self._lock:
+            if conn is not self._conn:
+                return  # an older process; its calls were already failed
+            pending, self._pending = self._pending, {}
+            code = self._process.exitcode if self._process is not None else None
+            self._process = self._conn = None
+            if not self._closing:
+                self.restarts += 1  # the next call starts a fresh worker
+        for fut in pending.values():
+            fut.set_exception(WorkerCrashed(f"{self.framework} worker exited (code {code}) during a call"))
+
+    def call(self, kind: str, system_prompt: str, user_prompt: str, model: str, temperature: float,
+             timeout: float | None = None, hedge: bool = False) -> dict:
+        fut: Future = Future()
+        with self._lock:
+            if self._process is None:
+                self._start()
+            req_id = next(self._ids)
+            self._pending[req_id] = fut
+            self._conn.send(("call", req_id, kind, system_prompt, user_prompt, model, temperature, timeout, hedge))
+        # the worker enforces `timeout` itself; past that plus a grace period it is considered wedged
+        wait = None if timeout is None else timeout + 30.0
+        try:
+            return fut.result(wait)
+        except FutureTimeoutError:  # not the builtin TimeoutError before Python 3.11
+            self.kill()
+            raise WorkerCrashed(f"{self.framework} worker did not answer within {wait:g}s; restarted") from None
+
+    def kill(self) -> None:
+        with self._lock:
+            proc, conn = self._process, self._conn
+        if proc is not None:
+            proc.kill()
+            proc.join(1.0)
+        if conn is not None:
+            self._fail_pending(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing = True
+            proc, conn = self._process, self._conn
+        if proc is None:
+            return
+        try:
+            conn.send(("stop",))
+        except (OSError, BrokenPipeError):
+            pass
+        proc.join(5.0)
+        if proc.is_alive():
+            proc.kill()
+            proc.join(1.0)
+
+
+class WorkerPool:
+    """One FrameworkWorker per framework; `frameworks` are started right away, others on first use."""
+
+    def __init__(self, setup: Dict[str, Any] | None = None, frameworks: Iterable[str] = ()):
+        self.setup = setup or {}
+        self._workers: Dict[str, FrameworkWorker] = {}
+        self._lock = threading.Lock()
+        for fw in frameworks:
+            self.worker(fw).start()
+
+    def worker(self, framework: str) -> FrameworkWorker:
+        with self._lock:
+            if framework not in self._workers:
+                self._workers[framework] = FrameworkWorker(framework, self.setup)
+            return self._workers[framework]
+
+    def restarts(self) -> Dict[str, int]:
+        return {fw: w.restarts for fw, w in self._workers.items() if w.restarts}
+
+    def close(self) -> None:
+        with self._lock:
+            workers: List[FrameworkWorker] = list(self._workers.values())
+        for w in workers:
+            w.close()
+
+
+_POOL: Optional[WorkerPool] = None
+
+
+def start_pool(setup: Dict[str, Any] | None = None, frameworks: Iterable[str] = ()) -> WorkerPool:
+    global _POOL
+    _POOL = WorkerPool(setup, frameworks)
+    atexit.register(_POOL.close)
+    return _POOL
+
+
+def get_pool() -> Optional[WorkerPool]:
+    """The isolation pool when --isolate is on, else None (runners run in-process)."""
+    return _POOL
@@ -0,0 +1,140 @@
+"""
+Throughput / saturation load test for one framework runner.
+
+At each concurrency level (1, 2, 4, ... N) that many sessions call the runner back to back for
+a fixed duration on the shared event loop; a level reports requests/sec, latency percentiles
+and error rate, plus the provider attempts behind those requests: the rate limiter retries
+throttled (429/503/529) and transient failures inside a request, so those attempts are read
+from the request's timeline (RETRY marks) rather than lost in its latency. The knee is the last level before throughput stops growing meaningfully (or
+errors take off), i.e. where the framework / provider saturates.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import numpy as np
+
+from common.utils import timing
+from common.utils.rate_limit import THROTTLE_STATUSES, RetriesExhausted
+
+# doubling concurrency must buy at least this much extra throughput to count as scaling
+KNEE_GAIN = 0.10
+# ... and must not push the error rate past this
+KNEE_MAX_ERROR_RATE = 0.05
+
+
+def levels_up_to(max_concurrency: int) -> List[int]:
+    levels, c = [], 1
+    while c < max_concurrency:
+        levels.append(c)
+        c *= 2
+    return levels + [max(1, max_concurrency)]
+
+
+async def _drive(factory: Callable[[], Awaitable[Any]], concurrency: int, duration_s: float,
+                 warmup_s: float = 0.0) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    retries = throttled = 0
+    start = time.perf_counter()
+    measure_from = start + warmup_s
+    deadline = measure_from + duration_s
+
+    async def session() -> None:
+        nonlocal retries, throttled
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            throttled_last = False
+            with timing.record() as tl:
+                try:
+                    await factory()
+                    ok, err = True, None
+                except Exception as e:  # a failed request is a data point, not a crash
+                    ok, err = False, type(e).__name__
+                    throttled_last = isinstance(e, RetriesExhausted) and e.status in THROTTLE_STATUSES
+            t1 = time.perf_counter()
+            if t0 < measure_from:
+                continue  # started during warm-up
+            retried = [e for e in tl.events if e["event"] == timing.RETRY]
+            retries += len(retried)
+            throttled += sum(e.get("status") in THROTTLE_STATUSES for e in retried) + throttled_last
+            if ok:
+                latencies.append(t1 - t0)
+            else:
+                errors[err] = errors.get(err, 0) + 1
+
+    await asyncio.gather(*(session() for _ in range(concurrency)))
+    # requests started before the deadline are allowed to finish; rate over the real window
+    elapsed = time.perf_counter() - measure_from
+    n_err = sum(errors.values())
+    total = len(latencies) + n_err
+    attempts = total + retries
+    lat = np.asarray(latencies, dtype=float)
+    p50, p90, p99 = (np.percentile(lat, [50, 90, 99]) if lat.size else (None, None, None))
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "error_rate": n_err / total if total else 0.0,
+        "attempts": attempts,
+        "retries": retries,
+        "throttled": throttled,
+        "throttle_rate": throttled / attempts if attempts else 0.0,
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_mean_s": float(lat.mean()) if lat.size else None,
+        "latency_p50_s": None if p50 is None else float(p50),
+        "latency_p90_s": None if p90 is None else float(p90),
+        "latency_p99_s": None if p99 is None else float(p99),
+    }
+
+
+def find_knee(results: List[Dict[str, Any]]) -> int | None:
+    """Concurrency level after which throughput gains fall below KNEE_GAIN (or errors rise)."""
+    if not results:
+        return None
+    knee = results[0]["concurrency"]
+    for prev, cur in zip(results, results[1:]):
+        scaled = prev["rps"] > 0 and cur["rps"] >= prev["rps"] * (1 + KNEE_GAIN)
+        if not scaled or cur["error_rate"] > KNEE_MAX_ERROR_RATE:
+            return knee
+        knee = cur["concurrency"]
+    return knee
+
+
+def run_loadtest(factory: Callable[[], Awaitable[Any]], levels: List[int], duration_s: float,
+                 warmup_s: float = 0.0, on_level: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+    """Drive `factory` at each level on the shared loop; returns per-level results and the knee."""
+    from common.utils.event_loop import ensure_executor_workers, run_sync
+
+    # blocking runners go through asyncio.to_thread; don't let its default pool be the bottleneck
+    ensure_executor_workers(max(levels) + 4)
+    results = []
+    for level in levels:
+        res = run_sync(_drive(factory, level, duration_s, warmup_s))
+        results.append(res)
+        if on_level is not None:
+            on_level(res)
+    best = max(results, key=lambda r: r["rps"], default=None)
+    return {
+        "levels": results,
+        "knee_concurrency": find_knee(results),
+        "peak_rps": best["rps"] if best else None,
+        "peak_rps_concurrency": best["concurrency"] if best else None,
+    }
+
+
+def format_level(r: Dict[str, Any]) -> str:
+    def s(v):
+        return "   n/a" if v is None else f"{v:6.3f}"
+    return (f"  c={r['concurrency']:<4} rps={r['rps']:8.2f}  p50={s(r['latency_p50_s'])}s p90={s(r['latency_p90_s'])}s "
+            f"p99={s(r['latency_p99_s'])}s  errors={r['error_rate']:.1%} ({r['requests']} req)  "
+            f"throttled={r['throttle_rate']:.1%} ({r['attempts']} attempts)")
+
+
+def format_summary(framework: str, case: str, report: Dict[str, Any]) -> str:
+    return (f"=== LOADTEST: {framework} | {case} ===\n"
+            f"  knee at concurrency {report['knee_concurrency']}; peak {report['peak_rps']:.2f} rps "
+            f"at concurrency {report['peak_rps_concurrency']}")
@@ -0,0 +1,88 @@
+"""
+LRU cache of constructed framework objects (agents, crews' agents, ADK runners).
+
+Objects are *leased*: a cell takes an idle instance for its key (or builds one), uses it
+exclusively, and returns it afterwards, so concurrent cells never share mutable agent state.
+Per-run state (tasks, crews, sessions) is still created fresh by the runner each call. Build
+time and whether the object came from the cache are marked on the call's timeline
+(timing.AGENT_BUILD), keeping cold-start construction apart from steady-state latency.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, List
+
+from common.utils import timing
+
+# idle objects kept across all keys of one cache; 0 disables caching
+DEFAULT_SIZE = int(os.getenv("AE_OBJECT_CACHE_SIZE", "32"))
+
+
+def object_key(kind: str, model: str, temperature: float, tools: tuple = (), system_prompt: str = "") -> tuple:
+    """Cache key for an agent built for a case type, model, temperature, tool set and instructions."""
+    prompt_digest = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+    return (kind, model, temperature, tuple(tools), prompt_digest)
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = DEFAULT_SIZE):
+        self.maxsize = max(0, maxsize)
+        self._idle: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self._count = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _take(self, key: Hashable) -> Any:
+        with self._lock:
+            items = self._idle.get(key)
+            if not items:
+                self.misses += 1
+                return None
+            obj = items.pop()
+            if not items:
+                del self._idle[key]
+            self._count -= 1
+            self.hits += 1
+            return obj
+
+    def _give_back(self, key: Hashable, obj: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append(obj)
+            self._idle.move_to_end(key)
+            self._count += 1
+            # evict least recently used keys first
+            while self._count > self.maxsize:
+                old_key, items = next(iter(self._idle.items()))
+                items.pop(0)
+                self._count -= 1
+                if not items:
+                    del self._idle[old_key]
+
+    @contextmanager
+    def lease(self, key: Hashable, build: Callable[[], Any]) -> Iterator[Any]:
+        """Yield an idle object for `key` (or a newly built one) and return it to the cache afterwards."""
+        obj = self._take(key)
+        cached = obj is not None
+        t0 = time.perf_counter()
+        if not cached:
+            obj = build()
+        timing.mark(timing.AGENT_BUILD, cached=cached, duration_s=time.perf_counter() - t0)
+        ok = False
+        try:
+            yield obj
+            ok = True
+        finally:
+            # an object whose run blew up may be in a bad state; let it go
+            if ok:
+                self._give_back(key, obj)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._count = 0
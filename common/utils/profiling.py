@@ -0,0 +1,279 @@
+"""
+`--profile` support: cProfile + tracemalloc around each cell.
+
+A cell's work is spread over three kinds of thread: the scheduler thread that runs the cell
+(prompt building, scoring, waiting for the runner), the shared event-loop thread (async runner
+and SDK code) and the loop's executor threads used by asyncio.to_thread (blocking SDK calls such
+as CrewAI's kickoff). While a cell is profiled each of them gets its own cProfile.Profile, so
+cells must run one at a time (the harness forces --concurrency 1). Executor work is profiled
+per work item the cell submitted; threads the cell didn't start work on (servers, pools, SDK
+background threads) are not counted. Functions already on a thread's stack when its profiler
+is enabled are left out, so waits that began before the cell aren't booked to it.
+
+Self time of every function is attributed to one of:
+  harness     - code in this repository
+  sdk         - framework / provider SDKs (crewai, google.adk, google.genai, air, litellm, ...)
+  io_wait     - blocking waits: selectors, sockets, SSL reads, sleeps, lock waits in SDK threads
+  runner_wait - the cell thread blocked on the runner's result (time spent elsewhere)
+  other       - standard library and remaining third-party code
+"""
+from __future__ import annotations
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
+SDK_PACKAGES = ("crewai", "crewai_tools", "google/adk", "google/genai", "air", "litellm", "openai",
+                "anthropic", "httpx", "httpcore", "aiohttp", "langchain", "pydantic")
+_SDK_RE = re.compile(r"[/\\](?:site|dist)-packages[/\\](?:%s)[/\\]" % "|".join(re.escape(p) for p in SDK_PACKAGES))
+
+# builtins that block on the outside world
+_IO_WAIT_RE = re.compile(
+    r"select\.(?:epoll|poll|select|kqueue)|'(?:poll|select|control)' of 'select\.|_socket\.socket|"
+    r"_ssl\._SSLSocket|time\.sleep|'(?:recv|recv_into|send|sendall|connect|read|readinto)' of"
+)
+_LOCK_WAIT_RE = re.compile(r"'acquire' of '_thread\.(?:lock|RLock)'|'wait' of '_thread")
+
+TOP_N = 25
+_MEM_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+                tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, pstats.__file__))
+
+
+def _category(func: Tuple[str, int, str], thread_kind: str) -> str:
+    filename, _, name = func
+    if filename == "~":  # builtin
+        if _IO_WAIT_RE.search(name):
+            return "io_wait"
+        if _LOCK_WAIT_RE.search(name):
+            return "runner_wait" if thread_kind == "cell" else "io_wait"
+        return "other"
+    if _SDK_RE.search(filename):
+        return "sdk"
+    if filename.startswith(REPO_ROOT) and "-packages" not in filename:
+        return "harness"
+    return "other"
+
+
+def _stack_functions(frame) -> frozenset:
+    """pstats keys of the functions on the stack from `frame` outwards."""
+    funcs = set()
+    while frame is not None:
+        code = frame.f_code
+        funcs.add((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return frozenset(funcs)
+
+
+def _drop_profiler_frames(stats: pstats.Stats, outer: frozenset = frozenset()) -> pstats.Stats:
+    # a profiler enabled mid-thread books the untracked outer frames to its own enable() call,
+    # and frames that were already running when it started only report partial, misleading times
+    for func in [f for f in stats.stats if "_lsprof.Profiler" in f[2] or f in outer]:
+        del stats.stats[func]
+    return stats
+
+
+def attribute(stats: pstats.Stats, thread_kind: str) -> Dict[str, float]:
+    out: Dict[str, float] = defaultdict(float)
+    for func, (_, _, tottime, _, _) in stats.stats.items():
+        out[_category(func, thread_kind)] += tottime
+    return dict(out)
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.relpath(filename, REPO_ROOT) if filename.startswith(REPO_ROOT) else filename}:{line}({name})"
+
+
+def top_functions(stats: pstats.Stats, n: int = TOP_N) -> List[Dict[str, Any]]:
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+    return [{"function": _label(func), "calls": nc, "tottime_s": tt, "cumtime_s": ct}
+            for func, (_, nc, tt, ct, _) in rows]
+
+
+class _CellCapture:
+    def __init__(self):
+        # (thread kind, disabled profile, functions on the stack when it was enabled)
+        self.profiles: List[Tuple[str, cProfile.Profile, frozenset]] = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def add(self, kind: str, prof: cProfile.Profile, outer: frozenset = frozenset()) -> None:
+        with self.lock:
+            # work still running when the cell ended (e.g. an abandoned to_thread call) isn't counted
+            if not self.closed:
+                self.profiles.append((kind, prof, outer))
+
+    def close(self) -> List[Tuple[str, cProfile.Profile, frozenset]]:
+        with self.lock:
+            self.closed = True
+            return list(self.profiles)
+
+
+class _ProfiledExecutor(ThreadPoolExecutor):
+    """Default executor for a profiled cell: each submitted work item runs under its own profiler."""
+
+    def __init__(self, capture: _CellCapture, **kwargs):
+        super().__init__(thread_name_prefix="ae-profiled", **kwargs)
+        self._capture = capture
+
+    def submit(self, fn, /, *args, **kwargs):
+        capture = self._capture
+
+        def _run():
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.disable()
+                capture.add("worker", prof)
+
+        return super().submit(_run)
+
+
+class Profiler:
+    """Per-cell profiles written to `out_dir`, plus an aggregate across the sweep."""
+
+    def __init__(self, out_dir: Path | str, top_n: int = TOP_N):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.top_n = top_n
+        self._aggregate: pstats.Stats | None = None
+        self._by_framework: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._cells = 0
+        tracemalloc.start(10)
+
+    def _on_loop(self, fn) -> Any:
+        from common.utils import event_loop
+        loop = event_loop.get_loop()
+        done = threading.Event()
+        box: Dict[str, Any] = {}
+
+        def _call() -> None:
+            try:
+                box["value"] = fn(loop)
+            finally:
+                done.set()
+
+        loop.call_soon_threadsafe(_call)
+        done.wait()
+        return box.get("value")
+
+    @contextmanager
+    def cell(self, key: str, framework: str) -> Iterator[None]:
+        capture = _CellCapture()
+        executor = _ProfiledExecutor(capture)
+        loop_state: Dict[str, Any] = {}
+
+        def _start_loop(loop) -> None:
+            # to_thread work submitted during this cell runs (and is profiled) on the cell's executor;
+            # the loop's own executor (sized by ensure_executor_workers) is put back afterwards
+            loop_state["previous_executor"] = getattr(loop, "_default_executor", None)
+            loop.set_default_executor(executor)
+            loop_state["outer"] = _stack_functions(sys._getframe())
+            prof = loop_state["prof"] = cProfile.Profile()
+            prof.enable()
+
+        def _stop_loop(loop) -> None:
+            loop_state["prof"].disable()
+            loop._default_executor = loop_state["previous_executor"]
+
+        # snapshots are slow; take them outside the profiled window so every profile fits in `wall`
+        tracemalloc.reset_peak()
+        mem_before = tracemalloc.take_snapshot().filter_traces(_MEM_FILTERS)
+        main = cProfile.Profile()
+        outer = _stack_functions(sys._getframe())
+        t0 = time.perf_counter()
+        self._on_loop(_start_loop)
+        main.enable()
+        try:
+            yield
+        finally:
+            main.disable()
+            self._on_loop(_stop_loop)
+            wall = time.perf_counter() - t0
+            # don't wait: an abandoned to_thread call may never return; its profile isn't counted
+            executor.shutdown(wait=False)
+            profiles = [("cell", main, outer), ("loop", loop_state["prof"], loop_state["outer"])] + capture.close()
+            _, mem_peak = tracemalloc.get_traced_memory()
+            mem_diff = [d for d in tracemalloc.take_snapshot().filter_traces(_MEM_FILTERS).compare_to(mem_before, "lineno")
+                        if d.size_diff > 0]
+            self._write(key, framework, wall, profiles, mem_peak, mem_diff)
+
+    def _write(self, key: str, framework: str, wall: float, profiles: List[Tuple[str, cProfile.Profile, frozenset]],
+               mem_peak: int, mem_diff) -> None:
+        per_thread: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        merged: pstats.Stats | None = None
+        for kind, prof, outer in profiles:
+            st = _drop_profiler_frames(pstats.Stats(prof), outer)
+            for cat, t in attribute(st, kind).items():
+                per_thread[kind][cat] += t
+            merged = st if merged is None else merged.add(st)
+
+        totals: Dict[str, float] = defaultdict(float)
+        for cats in per_thread.values():
+            for cat, t in cats.items():
+                totals[cat] += t
+        for cat, t in totals.items():
+            self._by_framework[framework][cat] += t
+        self._by_framework[framework]["wall_s"] += wall
+
+        stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", key)
+        merged.dump_stats(str(self.out_dir / f"{stem}.prof"))
+        report = {
+            "cell": key,
+            "framework": framework,
+            "wall_s": wall,
+            "attribution_s": dict(totals),
+            "by_thread_s": {k: dict(v) for k, v in per_thread.items()},
+            "top_functions": top_functions(merged, self.top_n),
+            "memory": {
+                "peak_traced_bytes": mem_peak,
+                "top_allocations": [{"where": str(d.traceback[0]), "size_diff_bytes": d.size_diff,
+                                     "count_diff": d.count_diff} for d in mem_diff[:self.top_n]],
+            },
+        }
+        (self.out_dir / f"{stem}.json").write_text(json.dumps(report, indent=2, default=str))
+
+        self._aggregate = merged if self._aggregate is None else self._aggregate.add(merged)
+        self._cells += 1
+
+    def close(self) -> str:
+        """Stop profiling, write the aggregate profile and return the text report."""
+        tracemalloc.stop()
+        if self._aggregate is None:
+            return "No cells were profiled."
+        self._aggregate.dump_stats(str(self.out_dir / "aggregate.prof"))
+        summary = {
+            "cells": self._cells,
+            "by_framework_s": {fw: dict(v) for fw, v in self._by_framework.items()},
+            "top_functions": top_functions(self._aggregate, self.top_n),
+        }
+        (self.out_dir / "summary.json").write_text(json.dumps(summary, indent=2, default=str))
+        return format_report(summary, self.out_dir)
+
+
+def format_report(summary: Dict[str, Any], out_dir: Path | str = "") -> str:
+    lines = ["", f"=== PROFILE ({summary['cells']} cell(s), files in {out_dir}) ==="]
+    for fw, cats in summary["by_framework_s"].items():
+        work = ", ".join(f"{c}={cats.get(c, 0.0):.3f}s" for c in ("harness", "sdk", "other"))
+        waits = ", ".join(f"{c}={cats.get(c, 0.0):.3f}s" for c in ("io_wait", "runner_wait"))
+        lines.append(f"  {fw}: wall={cats.get('wall_s', 0.0):.3f}s  work: {work}  waits (summed over threads): {waits}")
+    lines.append(f"  top {len(summary['top_functions'])} functions by self time:")
+    for row in summary["top_functions"]:
+        lines.append(f"    {row['tottime_s']:9.4f}s {row['calls']:>8}  {row['function']}")
+    return "\n".join(lines)
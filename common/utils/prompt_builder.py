@@ -1,14 +1,92 @@
 from __future__ import annotations
+import copy
+import json
+import re
+from functools import lru_cache
 from pathlib import Path
-import yaml
+from typing import Iterator
+
+from common.utils import tracing
 
 CASES_DIR = Path(__file__).parent.parent / "cases"
 
-def load_case(case_name: str) -> dict:
+@lru_cache(maxsize=None)
+def _load_template(case_name: str) -> dict:
+    # parsed once per process; every cell / suite instance works on a copy
+    import yaml  # deferred: keeps CLI start-up cheap
+
     path = CASES_DIR / f"{case_name}.yaml"
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+def load_case(case_name: str) -> dict:
+    with tracing.span("load_case", cat="case", case=case_name):
+        return copy.deepcopy(_load_template(case_name))
+
+def case_type(case_cfg: dict) -> str:
+    """What kind of task a case is; runners implement one arun_<type> method per type."""
+    return case_cfg.get("type") or case_cfg.get("name")
+
+def is_suite(case_cfg: dict) -> bool:
+    return bool(case_cfg.get("dataset"))
+
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+def _fill(text: str, row: dict) -> str:
+    # only {name} tokens naming a row field are replaced; any other braces (JSON, dict
+    # literals, unknown {placeholders}) are left as written
+    return _PLACEHOLDER_RE.sub(lambda m: str(row[m.group(1)]) if m.group(1) in row else m.group(0), text)
+
+def _iter_rows(path: Path) -> Iterator[dict]:
+    """Stream dataset rows from .jsonl or .parquet without reading the whole file."""
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(f"Reading {path.name} requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def render_instance(template: dict, row: dict, index: int) -> dict:
+    """Fill a suite template with one dataset row: {placeholders} in prompts, merged expectations."""
+    ds = template["dataset"]
+    inst = {k: copy.deepcopy(v) for k, v in template.items() if k not in ("dataset", "prompts", "expectations")}
+    inst["prompts"] = {k: (_fill(v, row) if isinstance(v, str) else v)
+                       for k, v in (template.get("prompts") or {}).items()}
+    inst["prompts"].update(row.get("prompts") or {})
+    inst["expectations"] = dict(template.get("expectations") or {}, **(row.get("expectations") or {}))
+    inst["instance_id"] = f"{template['name']}/{row.get(ds.get('id_field', 'id'), index)}"
+    inst["params"] = row
+    return inst
+
+def iter_case_instances(case_name: str) -> Iterator[dict]:
+    """
+    Yield the runnable instances of a case.
+
+    A plain case yields itself once. A suite (a case YAML with a `dataset:` block) yields
+    one rendered instance per dataset row, lazily, so suites of any size stream through.
+    """
+    template = _load_template(case_name)
+    if not is_suite(template):
+        inst = load_case(case_name)
+        inst.setdefault("instance_id", case_name)
+        yield inst
+        return
+    path = Path(template["dataset"]["path"])
+    if not path.is_absolute():
+        path = CASES_DIR / path
+    limit = template["dataset"].get("limit")
+    for i, row in enumerate(_iter_rows(path)):
+        if limit is not None and i >= limit:
+            return
+        yield render_instance(template, row, i)
+
 def get_prompts(case_cfg: dict) -> tuple[str, str]:
     sys = (case_cfg.get("prompts", {}) or {}).get("system", "").strip()
     usr = (case_cfg.get("prompts", {}) or {}).get("user", "").strip()
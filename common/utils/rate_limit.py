@@ -0,0 +1,266 @@
+"""
+Provider-aware rate limiting and retries for runner calls.
+
+Each provider (or base URL) gets one ProviderLimiter shared by every cell in the process:
+token buckets for requests-per-minute and tokens-per-minute, an adaptive (AIMD) concurrency
+cap that halves when the provider throttles and creeps back up on success, and retries with
+jittered exponential backoff that honours Retry-After. Waits and retries are marked on the
+call's timeline (THROTTLE_WAIT / RETRY) so the latency metric can leave them out.
+
+A call is admitted on one request and the caller's token estimate. Once it succeeds, the usage
+it reported (usage.record_usage inside the call) is charged back: the tokens actually used
+replace the estimate, and every provider request beyond the first (agent and crew runs make
+several model calls) is taken from the RPM bucket, so later calls wait for the real spend.
+
+A call that still fails with a retryable error after max_retries retries raises RetriesExhausted,
+which the harness records as the cell's error rather than aborting the sweep.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from common.utils import timing, usage
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# statuses that mean "slow down": they count as throttling and shrink the concurrency cap
+THROTTLE_STATUSES = {429, 503, 529}
+DEFAULT_MAX_RETRIES = int(os.getenv("AE_MAX_RETRIES", "5"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("AE_MAX_PROVIDER_CONCURRENCY", "64"))
+
+
+class RetriesExhausted(RuntimeError):
+    """A call kept failing with retryable errors (throttling, transient faults) until retries ran out."""
+
+    def __init__(self, key: str, attempts: int, status: Optional[int], cause: BaseException):
+        super().__init__(f"{key}: gave up after {attempts} attempt(s); last error {type(cause).__name__}: {cause}")
+        self.key = key
+        self.attempts = attempts
+        self.status = status
+
+
+class TokenBucket:
+    """Reservation-style token bucket: callers reserve up front and sleep off any deficit (FIFO-fair)."""
+
+    def __init__(self, per_minute: float, burst: float | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1.0) -> float:
+        """Take `n` tokens and return how long the caller must wait before using them."""
+        n = min(n, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            return max(0.0, -self.tokens / self.rate)
+
+    def charge(self, n: float) -> None:
+        """Debit `n` tokens after the fact (negative refunds); later reservations wait for the deficit."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate - n)
+            self.updated = now
+
+    async def acquire(self, n: float = 1.0) -> float:
+        wait = self.reserve(n)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency cap: halve on throttling, +1 after `limit` consecutive successes."""
+
+    def __init__(self, maximum: int = DEFAULT_MAX_CONCURRENCY, minimum: int = 1, initial: int | None = None):
+        self.max = max(1, maximum)
+        self.min = max(1, min(minimum, self.max))
+        self.limit = initial or self.max
+        self.in_flight = 0
+        self._successes = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self):
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with cond:
+                self.in_flight -= 1
+                cond.notify_all()
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.min, self.limit // 2)
+        self._successes = 0
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max:
+            self.limit += 1
+            self._successes = 0
+
+
+def classify_error(exc: BaseException) -> Tuple[bool, Optional[int], Optional[float]]:
+    """(retryable, status, retry_after_s) for an exception raised by a provider SDK / HTTP client."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True, None, None
+    response = getattr(exc, "response", None)
+    status = None
+    for candidate in (getattr(exc, "status_code", None), getattr(exc, "status", None),
+                      getattr(response, "status_code", None), getattr(exc, "code", None)):
+        if isinstance(candidate, int):
+            status = candidate
+            break
+    if status is None and "ratelimit" in type(exc).__name__.lower():
+        status = 429
+    headers = getattr(exc, "headers", None) or getattr(response, "headers", None) or {}
+    retry_after = None
+    try:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        retry_after = float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        retry_after = None
+    return status in RETRYABLE_STATUSES, status, retry_after
+
+
+class ProviderLimiter:
+    def __init__(self, key: str, rpm: float | None = None, tpm: float | None = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.key = key
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "throttle_wait_s": 0.0}
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # full jitter, but never sooner than the provider asked for
+        delay = random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        return max(delay, retry_after or 0.0)
+
+    def _charge_usage(self, records: list, est_tokens: int) -> None:
+        if not records:
+            return
+        if self.tokens is not None:
+            used = sum(r["prompt_tokens"] + r["completion_tokens"] + r["tool_tokens"] for r in records)
+            self.tokens.charge(used - est_tokens)
+        if self.requests is not None:
+            extra = sum(r.get("requests", 1) for r in records) - 1
+            if extra > 0:
+                self.requests.charge(extra)
+
+    async def call(self, factory: Callable[[], Awaitable[T]], est_tokens: int = 0) -> T:
+        """Await `factory()` under this provider's limits, retrying throttled / transient failures."""
+        self.stats["calls"] += 1
+        meter = usage.current()
+        attempt = 0
+        while True:
+            waited = 0.0
+            if self.requests is not None:
+                waited += await self.requests.acquire(1)
+            if self.tokens is not None and est_tokens:
+                waited += await self.tokens.acquire(est_tokens)
+            t_queue = time.perf_counter()
+            async with self.concurrency.slot():
+                waited += time.perf_counter() - t_queue
+                if waited > 0.001:
+                    self.stats["throttle_wait_s"] += waited
+                    timing.mark(timing.THROTTLE_WAIT, provider=self.key, duration_s=waited)
+                t0 = time.perf_counter()
+                seen = len(meter.records) if meter is not None else 0
+                try:
+                    result = await factory()
+                except Exception as exc:
+                    retryable, status, retry_after = classify_error(exc)
+                    if not retryable:
+                        raise
+                    if attempt >= self.max_retries:
+                        if status in THROTTLE_STATUSES:
+                            self.stats["throttled"] += 1
+                        raise RetriesExhausted(self.key, attempt + 1, status, exc) from exc
+                    failed_s = time.perf_counter() - t0
+                else:
+                    self.concurrency.on_success()
+                    if meter is not None:
+                        self._charge_usage(meter.records[seen:], est_tokens)
+                    return result
+
+            # outside the slot: back off without holding concurrency
+            if status in THROTTLE_STATUSES:
+                self.stats["throttled"] += 1
+                self.concurrency.on_throttle()
+            delay = self._backoff(attempt, retry_after)
+            self.stats["retries"] += 1
+            timing.mark(timing.RETRY, provider=self.key, attempt=attempt + 1, status=status,
+                        delay_s=delay, duration_s=failed_s + delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+_LIMITERS: Dict[str, ProviderLimiter] = {}
+_CONFIG: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def configure(key: str, **options: Any) -> None:
+    """Set limits for a provider before its first call (rpm, tpm, max_concurrency, max_retries, ...)."""
+    with _LOCK:
+        _CONFIG[key] = dict(_CONFIG.get(key, {}), **options)
+        _LIMITERS.pop(key, None)
+
+
+def parse_spec(spec: str) -> Tuple[str, Dict[str, float]]:
+    """'openrouter:rpm=60,tpm=200000,max_concurrency=4' -> ('openrouter', {...}); keys may be host:port."""
+    key, _, opts = spec.rpartition(":") if "=" in spec else (spec, "", "")
+    options: Dict[str, float] = {}
+    for item in opts.split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid rate-limit option '{item}', expected <name>=<value>")
+        value = float(value)
+        options[name.strip()] = int(value) if name.strip() in ("max_concurrency", "max_retries") else value
+    return key.strip(), options
+
+
+def limiter(key: str) -> ProviderLimiter:
+    with _LOCK:
+        if key not in _LIMITERS:
+            _LIMITERS[key] = ProviderLimiter(key, **_CONFIG.get(key, {}))
+        return _LIMITERS[key]
+
+
+def estimate_tokens(*texts: str) -> int:
+    # rough prompt size for the tokens-per-minute budget; real usage is reported after the call
+    return sum(len(t or "") for t in texts) // 4
+
+
+def key_for(provider: str, base_url: str | None = None) -> str:
+    """Limiter key: the provider name, or the host when a runner is pointed at another endpoint."""
+    if not base_url:
+        return provider
+    from urllib.parse import urlsplit
+    return urlsplit(base_url).netloc or provider
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_STORE_DIR = Path(os.getenv("AE_RESPONSE_STORE", ".response_store"))
+
+
+def prompt_hash(system_prompt: str, user_prompt: str) -> str:
+    h = hashlib.sha256()
+    h.update(system_prompt.encode("utf-8"))
+    h.update(b"\0")
+    h.update(user_prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+def response_key(framework: str, case_name: str, model: str, temperature: float,
+                 system_prompt: str, user_prompt: str, repetition: int = 0) -> str:
+    """Content address of one runner call: same inputs (and repetition) -> same key."""
+    fields = {
+        "framework": framework,
+        "case": case_name,
+        "model": model,
+        "temperature": float(temperature),
+        "prompts": prompt_hash(system_prompt, user_prompt),
+    }
+    # each repetition keeps its own sample; repetition 0 keeps the key it always had
+    if repetition:
+        fields["repetition"] = repetition
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """
+    Content-addressed store of raw runner outputs.
+
+    Each record lives in <root>/<key[:2]>/<key>.json and holds the output text plus
+    the timing captured when it was recorded, so metrics can be re-run offline.
+    """
+
+    def __init__(self, root: Path | str = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, key: str, record: Dict[str, Any]) -> Path:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = dict(record, key=key, recorded_at=time.time())
+        # write-then-rename so concurrent cells never see a half-written record; the temp file
+        # is unique per writer, since threads may record the same key at once
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, prefix=f".{key[:16]}.",
+                                         suffix=".tmp", delete=False) as f:
+            json.dump(record, f, ensure_ascii=False)
+        try:
+            os.replace(f.name, path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+        return path
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Set
+
+
+def config_hash(case_cfg: dict, framework: str) -> str:
+    """Hash of everything that defines a cell's configuration (prompts, model, expectations, metrics)."""
+    payload = {
+        "framework": framework,
+        "prompts": case_cfg.get("prompts"),
+        "llm": case_cfg.get("llm"),
+        "expectations": case_cfg.get("expectations"),
+        "metrics": case_cfg.get("metrics"),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def cell_key(case_name: str, framework: str, repetition: int, cfg_hash: str) -> str:
+    return f"{case_name}|{framework}|{repetition}|{cfg_hash}"
+
+
+def _drop_partial_line(path: Path) -> None:
+    """Truncate a file back to its last newline, discarding a record cut off by a crash mid-write."""
+    if not path.exists():
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # scan back in blocks for the last complete line
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            nl = block.rfind(b"\n")
+            if nl >= 0:
+                f.truncate(pos - step + nl + 1)
+                return
+            pos -= step
+        f.truncate(0)
+
+
+class JsonlSink:
+    """
+    Append-only JSONL result file: one record per completed cell, flushed as soon as it is written.
+
+    Safe to share between scheduler threads. With fsync=True every record is also forced to disk,
+    so at most the record being written is lost if the machine dies.
+    """
+
+    def __init__(self, path: Path | str, fsync: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        # appending after a torn last line would glue the next record onto it and lose both
+        _drop_partial_line(self.path)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(dict(record, completed_at=time.time()), ensure_ascii=False, default=str)
+        with self._lock:
+            self._f.write(line + "\n")
+            self._f.flush()
+            if self.fsync:
+                os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def iter_results(path: Path | str) -> Iterator[Dict[str, Any]]:
+    """Stream records back; a truncated last line (crash mid-write) is skipped."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _rank(rec: Dict[str, Any]) -> tuple:
+    # a successful record beats one that errored (deadline, worker crash); then the latest wins
+    return ("error" not in rec, rec.get("completed_at") or 0.0)
+
+
+def completed_cells(path: Path | str) -> Set[str]:
+    """Cells with a successful record; errored ones (deadline, crash) are run again on --resume."""
+    return {r["cell"] for r in iter_results(path) if "cell" in r and "error" not in r}
+
+
+def best_results(path: Path | str, cells: Set[str] | None = None) -> Dict[str, Dict[str, Any]]:
+    """One record per cell (optionally only `cells`), chosen like merge_results does."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for rec in iter_results(path):
+        cell = rec.get("cell")
+        if cell is None or (cells is not None and cell not in cells):
+            continue
+        if cell not in best or _rank(rec) > _rank(best[cell]):
+            best[cell] = rec
+    return best
+
+
+def merge_results(paths: list[Path | str], out_path: Path | str) -> Dict[str, int]:
+    """
+    Combine result files (e.g. one per shard or worker) into one, keeping one record per cell.
+
+    A successful record beats one that hit its deadline; otherwise the most recently completed
+    wins. Only (file, line) positions are held in memory, so large sweeps merge in two passes.
+    """
+    best: Dict[str, tuple] = {}
+    seen = 0
+    for i, path in enumerate(paths):
+        for j, rec in enumerate(iter_results(path)):
+            if "cell" not in rec:
+                continue
+            seen += 1
+            rank = _rank(rec)
+            if rec["cell"] not in best or rank > best[rec["cell"]][0]:
+                best[rec["cell"]] = (rank, i, j)
+
+    out_path = Path(out_path)
+    if any(Path(p).resolve() == out_path.resolve() for p in paths):
+        raise ValueError(f"merge output {out_path} is also an input")
+    keep = {(i, j) for _, i, j in best.values()}
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        for i, path in enumerate(paths):
+            for j, rec in enumerate(iter_results(path)):
+                if (i, j) in keep:
+                    f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+    return {"read": seen, "written": len(keep), "duplicates": seen - len(keep)}
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# A cell is (case_name, framework, *extra); extra fields (e.g. repetition) are passed through to fn
+Cell = Tuple[Any, ...]
+
+from frameworks import providers as manifest_providers
+
+
+def parse_limits(spec: str | None) -> Dict[str, int]:
+    """Parse 'crewai=2,adk=1' into {'crewai': 2, 'adk': 1}."""
+    limits: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid limit '{item}', expected <name>=<n>")
+        limits[key.strip()] = max(1, int(value))
+    return limits
+
+
+class MatrixScheduler:
+    """
+    Run (case, framework, ...) cells on a thread pool.
+
+    `concurrency` caps the total number of in-flight cells; `framework_limits` and
+    `provider_limits` add separate caps per framework / per provider. Results are
+    yielded in submission order regardless of completion order.
+
+    Capped cells wait in the dispatcher, not on a pool thread: a cell is handed to the pool
+    only once its framework and provider have a free slot, so a saturated framework never
+    holds worker threads that other frameworks' cells could use.
+    """
+
+    def __init__(self, concurrency: int = 1,
+                 framework_limits: Dict[str, int] | None = None,
+                 provider_limits: Dict[str, int] | None = None,
+                 providers: Dict[str, str] | None = None,
+                 max_pending: int | None = None):
+        self.concurrency = max(1, int(concurrency))
+        self.max_pending = max(self.concurrency, max_pending or self.concurrency * 8)
+        # which provider each framework talks to comes from the framework manifest
+        self.providers = dict(manifest_providers(), **(providers or {}))
+        self._limits: Dict[Tuple[str, str], int] = {("framework", k): max(1, int(v))
+                                                    for k, v in (framework_limits or {}).items()}
+        self._limits.update({("provider", k): max(1, int(v)) for k, v in (provider_limits or {}).items()})
+
+    def _cap_keys(self, framework: str) -> List[Tuple[str, str]]:
+        keys = [("framework", framework), ("provider", self.providers.get(framework, framework))]
+        return [k for k in keys if k in self._limits]
+
+    def run(self, cells: Iterable[Cell], fn: Callable[..., Any]) -> Iterator[Tuple[Cell, Any]]:
+        """Yield (cell, fn(*cell)) in the order of `cells`; exceptions re-raise in order."""
+        if self.concurrency == 1 and not self._limits:
+            for cell in cells:
+                yield cell, fn(*cell)
+            return
+
+        lock = threading.Lock()
+        waiting: deque = deque()          # (cell, result future) not yet handed to the pool
+        in_use: Dict[Tuple[str, str], int] = defaultdict(int)
+        state = {"running": 0, "closed": False}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ae-cell") as pool:
+
+            def execute(cell: Cell, out: Future) -> None:
+                try:
+                    out.set_result(fn(*cell))
+                except BaseException as e:
+                    out.set_exception(e)
+                finally:
+                    with lock:
+                        state["running"] -= 1
+                        for k in self._cap_keys(cell[1]):
+                            in_use[k] -= 1
+                    dispatch()
+
+            def dispatch() -> None:
+                # pick cells in matrix order, skipping those whose caps are full
+                ready = []
+                with lock:
+                    if state["closed"]:
+                        return
+                    for item in list(waiting):
+                        if state["running"] >= self.concurrency:
+                            break
+                        keys = self._cap_keys(item[0][1])
+                        if all(in_use[k] < self._limits[k] for k in keys):
+                            waiting.remove(item)
+                            for k in keys:
+                                in_use[k] += 1
+                            state["running"] += 1
+                            ready.append(item)
+                for cell, out in ready:
+                    pool.submit(execute, cell, out)
+
+            pending: deque = deque()
+            try:
+                for cell in cells:
+                    out: Future = Future()
+                    pending.append((cell, out))
+                    with lock:
+                        waiting.append((cell, out))
+                    dispatch()
+                    if len(pending) >= self.max_pending:
+                        head, fut = pending.popleft()
+                        yield head, fut.result()
+                while pending:
+                    head, fut = pending.popleft()
+                    yield head, fut.result()
+            finally:
+                # cells not yet handed to the pool are dropped; running ones finish
+                with lock:
+                    state["closed"] = True
+                    waiting.clear()
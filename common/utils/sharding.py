@@ -0,0 +1,96 @@
+"""
+Splitting one sweep across processes or machines.
+
+Static sharding (`--shard i/N`) assigns every (instance, framework, repetition) cell to exactly one
+of N shards by hash, so N independent runs cover the sweep with no coordination. The work-queue
+mode (`--queue DIR`) instead lets any number of workers claim cells from a shared directory:
+a claim is a lock file created with O_EXCL, and a finished cell leaves a `.done` marker. Either
+way each worker writes its own result file; `runner.py merge` combines them.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Tuple
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'2/8' -> (2, 8); shards are numbered 0..N-1."""
+    index, sep, count = spec.partition("/")
+    try:
+        i, n = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected <i>/<N>") from None
+    if not sep or n < 1 or not 0 <= i < n:
+        raise ValueError(f"Invalid shard '{spec}', expected <i>/<N> with 0 <= i < N")
+    return i, n
+
+
+def shard_of(instance_id: str, framework: str, repetition: int, shards: int) -> int:
+    # independent of the config hash, so editing a prompt doesn't reshuffle the shards
+    digest = hashlib.sha1(f"{instance_id}|{framework}|{repetition}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+class WorkQueue:
+    """
+    Cell claims in a shared directory (NFS, SMB, a mounted bucket with O_EXCL support).
+
+    A claim older than `lease_s` whose cell never finished is assumed to belong to a dead
+    worker and may be taken over; duplicates from an overly short lease are removed by merge.
+    """
+
+    def __init__(self, root: Path | str, lease_s: float = 3600.0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.lease_s = lease_s
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _path(self, key: str, suffix: str) -> Path:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.root / name[:2] / f"{name}{suffix}"
+
+    def is_done(self, key: str) -> bool:
+        return self._path(key, ".done").exists()
+
+    def claim(self, key: str) -> bool:
+        """True if this worker now owns `key`; False if it is done or held by a live claim."""
+        if self.is_done(key):
+            return False
+        lock = self._path(key, ".lock")
+        lock.parent.mkdir(exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if not self._break_stale(lock):
+                    return False
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"cell": key, "owner": self.owner, "claimed_at": time.time()}, f)
+            return True
+        return False
+
+    def _break_stale(self, lock: Path) -> bool:
+        try:
+            if time.time() - lock.stat().st_mtime < self.lease_s:
+                return False
+            # rename is atomic: of several workers spotting the stale claim, one wins the retry
+            lock.rename(lock.with_name(f"{lock.name}.stale-{self.owner.replace(':', '-')}"))
+            return True
+        except FileNotFoundError:
+            return True  # released meanwhile; try again
+        except OSError:
+            return False
+
+    def complete(self, key: str) -> None:
+        done = self._path(key, ".done")
+        done.write_text(json.dumps({"cell": key, "owner": self.owner, "completed_at": time.time()}))
+        self._path(key, ".lock").unlink(missing_ok=True)
+
+    def release(self, key: str) -> None:
+        """Give a claimed cell back (e.g. the worker is shutting down before running it)."""
+        self._path(key, ".lock").unlink(missing_ok=True)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Events that make up the per-call timeline; runners may add others freely
+RUNNER_INIT = "runner_init"          # framework runner class instantiated (recorded by the harness)
+CONSTRUCTED = "constructed"          # agents / crews / runners built
+AGENT_BUILD = "agent_build"          # agent object built or leased from the cache (cached, duration_s)
+SESSION_CREATED = "session_created"  # framework session ready (ADK)
+FIRST_EVENT = "first_event"          # first event / step / response chunk from the framework
+FIRST_TOKEN = "first_token"          # first streamed model text
+TOOL_CALL = "tool_call"              # agent asked for a tool (search, code interpreter, ...)
+TOOL_RESULT = "tool_result"          # tool returned
+CODE_EXECUTION = "code_execution"    # code handed to an executor
+CODE_RESULT = "code_result"          # executor returned output
+FINAL_RESPONSE = "final_response"    # final answer available
+THROTTLE_WAIT = "throttle_wait"      # waited on a rate limit / concurrency cap (duration_s)
+RETRY = "retry"                      # a failed attempt plus its backoff (duration_s)
+HEDGE = "hedge"                      # duplicate request fired after the call passed its p95
+DEADLINE = "deadline"                # call cancelled at its cell / sweep deadline
+
+_CURRENT: ContextVar[Optional["Timeline"]] = ContextVar("ae_timeline", default=None)
+
+
+class Timeline:
+    """Timestamped events for one runner call, relative to the start of the call."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+
+    def mark(self, event: str, **attrs: Any) -> None:
+        self.events.append({"event": event, "t": time.perf_counter() - self.t0, **attrs})
+
+    def first(self, event: str) -> Optional[float]:
+        for e in self.events:
+            if e["event"] == event:
+                return e["t"]
+        return None
+
+
+def current() -> Optional[Timeline]:
+    """The timeline of the call in progress (None outside the harness)."""
+    return _CURRENT.get()
+
+
+def mark(event: str, **attrs: Any) -> None:
+    """Record an event on the current timeline; a no-op when nothing is recording."""
+    tl = _CURRENT.get()
+    if tl is not None:
+        tl.mark(event, **attrs)
+
+
+@contextmanager
+def record() -> Iterator[Timeline]:
+    tl = Timeline()
+    token = _CURRENT.set(tl)
+    try:
+        yield tl
+    finally:
+        _CURRENT.reset(token)
+
+
+def breakdown(events: List[Dict[str, Any]], total_s: float) -> Dict[str, Any]:
+    """Summarise a timeline into the phases we compare frameworks on."""
+    def first(name: str) -> Optional[float]:
+        return next((e["t"] for e in events if e["event"] == name), None)
+
+    runner_init = next((e.get("duration_s") for e in events if e["event"] == RUNNER_INIT), None)
+    constructed = first(CONSTRUCTED)
+    first_event = first(FIRST_EVENT)
+    tool_events = [e for e in events if e["event"] in (TOOL_CALL, TOOL_RESULT, CODE_EXECUTION, CODE_RESULT)]
+    # a runner may post-process after the model answers, so the last final mark wins
+    final = next((e["t"] for e in reversed(events) if e["event"] == FINAL_RESPONSE), None)
+    throttle_wait = sum((e.get("duration_s") or 0.0 for e in events if e["event"] == THROTTLE_WAIT), 0.0)
+    retries = [e for e in events if e["event"] == RETRY]
+    builds = [e for e in events if e["event"] == AGENT_BUILD]
+    return {
+        "runner_init_s": runner_init,
+        "construction_s": constructed,
+        # agent construction alone, 0 when every agent came from the object cache (cold vs steady state)
+        "agent_build_s": sum((e.get("duration_s") or 0.0 for e in builds), 0.0) if builds else None,
+        "agent_cached": all(e.get("cached") for e in builds) if builds else None,
+        "session_created_s": first(SESSION_CREATED),
+        "first_event_s": first_event,
+        # time the model took to produce something once the agent was ready
+        "time_to_first_event_s": (first_event - (constructed or 0.0)) if first_event is not None else None,
+        "first_token_s": first(FIRST_TOKEN),
+        "tool_events": tool_events,
+        "final_response_s": final if final is not None else total_s,
+        "total_s": total_s,
+        # time not spent on the model: rate-limit waits, failed attempts and their backoff
+        "throttle_wait_s": throttle_wait,
+        "retries": len(retries),
+        "retry_s": sum((e.get("duration_s") or 0.0 for e in retries), 0.0),
+    }
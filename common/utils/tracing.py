@@ -0,0 +1,148 @@
+"""
+Sweep timeline export in Chrome trace-event format (open in https://ui.perfetto.dev or chrome://tracing).
+
+Spans are cheap no-ops until `start(path)` is called (`--trace PATH`). Events stream to the file
+as they finish, so a long sweep doesn't hold its trace in memory. Layout:
+  "workers" process    - one track per harness thread (scheduler workers, event loop, sandbox
+                         waits): nested spans for cells, runner calls, metrics, sandbox runs, and
+                         the runner's timing marks as instant events
+  "frameworks" process - one track per framework with an async slice per cell, so overlapping
+                         cells of the same framework are visible side by side
+"""
+from __future__ import annotations
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from common.utils import timing
+
+WORKERS_PID = 1
+FRAMEWORKS_PID = 2
+
+
+class Tracer:
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "w", encoding="utf-8")
+        self._f.write("[")
+        self._first = True
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter_ns()
+        self._threads: set[int] = set()
+        self._framework_tids: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._emit({"ph": "M", "name": "process_name", "pid": WORKERS_PID, "tid": 0, "args": {"name": "workers"}})
+        self._emit({"ph": "M", "name": "process_name", "pid": FRAMEWORKS_PID, "tid": 0, "args": {"name": "frameworks"}})
+
+    def now_us(self, perf_counter_s: float | None = None) -> float:
+        ns = time.perf_counter_ns() if perf_counter_s is None else int(perf_counter_s * 1e9)
+        return (ns - self._t0) / 1000.0
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, default=str)
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(("\n" if self._first else ",\n") + line)
+            self._first = False
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads.add(tid)
+            self._emit({"ph": "M", "name": "thread_name", "pid": WORKERS_PID, "tid": tid,
+                        "args": {"name": threading.current_thread().name}})
+        return tid
+
+    def framework_tid(self, framework: str) -> int:
+        with self._lock:
+            if framework not in self._framework_tids:
+                self._framework_tids[framework] = len(self._framework_tids) + 1
+                new = True
+            else:
+                new = False
+            tid = self._framework_tids[framework]
+        if new:
+            self._emit({"ph": "M", "name": "thread_name", "pid": FRAMEWORKS_PID, "tid": tid, "args": {"name": framework}})
+        return tid
+
+    def complete(self, name: str, cat: str, start_us: float, dur_us: float, args: Dict[str, Any]) -> None:
+        self._emit({"ph": "X", "name": name, "cat": cat, "pid": WORKERS_PID, "tid": self._tid(),
+                    "ts": start_us, "dur": dur_us, "args": args})
+
+    def instant(self, name: str, cat: str, ts_us: float | None = None, **args: Any) -> None:
+        self._emit({"ph": "i", "s": "t", "name": name, "cat": cat, "pid": WORKERS_PID, "tid": self._tid(),
+                    "ts": self.now_us() if ts_us is None else ts_us, "args": args})
+
+    def async_slice(self, framework: str, name: str, start_us: float, end_us: float, args: Dict[str, Any]) -> None:
+        tid, sid = self.framework_tid(framework), next(self._ids)
+        base = {"name": name, "cat": framework, "pid": FRAMEWORKS_PID, "tid": tid, "id": sid}
+        self._emit(dict(base, ph="b", ts=start_us, args=args))
+        self._emit(dict(base, ph="e", ts=end_us))
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.write("\n]\n")
+                self._f.close()
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def start(path: Path | str) -> Tracer:
+    global _TRACER
+    _TRACER = Tracer(path)
+    return _TRACER
+
+
+def stop() -> None:
+    global _TRACER
+    if _TRACER is not None:
+        _TRACER.close()
+        _TRACER = None
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+@contextmanager
+def span(name: str, cat: str = "harness", framework: str | None = None, **args: Any) -> Iterator[None]:
+    """Time a block on the current thread's track (and on `framework`'s track when given)."""
+    tracer = _TRACER
+    if tracer is None:
+        yield
+        return
+    start_us = tracer.now_us()
+    try:
+        yield
+    finally:
+        end_us = tracer.now_us()
+        tracer.complete(name, cat, start_us, end_us - start_us, args)
+        if framework is not None:
+            tracer.async_slice(framework, name, start_us, end_us, args)
+
+
+def timeline_events(timeline, framework: str | None = None) -> None:
+    """Replay a timing.Timeline's marks as instant events (and durations as slices) on this thread's track."""
+    tracer = _TRACER
+    if tracer is None:
+        return
+    base_us = tracer.now_us(timeline.t0)
+    for e in timeline.events:
+        attrs = {k: v for k, v in e.items() if k not in ("event", "t")}
+        if framework:
+            attrs["framework"] = framework
+        ts = base_us + e["t"] * 1e6
+        if e.get("duration_s") and e["event"] in (timing.THROTTLE_WAIT, timing.RETRY):
+            # recorded when the wait ended
+            dur = e["duration_s"] * 1e6
+            tracer.complete(e["event"], "llm", ts - dur, dur, attrs)
+        else:
+            tracer.instant(e["event"], "llm", ts, **attrs)
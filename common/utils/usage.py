@@ -0,0 +1,56 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_CURRENT: ContextVar[Optional["UsageMeter"]] = ContextVar("ae_usage", default=None)
+
+
+class UsageMeter:
+    """Token usage reported by the provider(s) during one runner call."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def add(self, model: str | None = None, prompt_tokens: int = 0, completion_tokens: int = 0,
+            tool_tokens: int = 0, source: str | None = None, requests: int = 1) -> None:
+        self.records.append({
+            "model": model,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "tool_tokens": int(tool_tokens or 0),
+            "source": source,
+            # provider requests this record covers (an aggregated crew run may span several)
+            "requests": int(requests or 1),
+        })
+
+
+def current() -> Optional[UsageMeter]:
+    return _CURRENT.get()
+
+
+def record_usage(model: str | None = None, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 tool_tokens: int = 0, source: str | None = None, requests: int = 1) -> None:
+    """Add provider-reported usage to the current call; a no-op outside the harness."""
+    meter = _CURRENT.get()
+    if meter is not None:
+        meter.add(model, prompt_tokens, completion_tokens, tool_tokens, source, requests)
+
+
+@contextmanager
+def record() -> Iterator[UsageMeter]:
+    meter = UsageMeter()
+    token = _CURRENT.set(meter)
+    try:
+        yield meter
+    finally:
+        _CURRENT.reset(token)
+
+
+def totals(records: List[Dict[str, Any]]) -> Dict[str, int]:
+    out = {"prompt_tokens": 0, "completion_tokens": 0, "tool_tokens": 0}
+    for r in records:
+        for k in out:
+            out[k] += int(r.get(k) or 0)
+    out["total_tokens"] = sum(out.values())
+    return out
@@ -0,0 +1,93 @@
+"""
+Framework plugin manifest.
+
+Everything the harness needs to know about a framework before running it (runner
+module/class, provider, supported case types) is declared here, so listing frameworks or
+planning a sweep never imports a framework SDK. Runner modules are imported only when
+a cell actually runs on that framework.
+
+Out-of-tree frameworks can be added with a YAML file named by $AE_FRAMEWORK_MANIFEST:
+
+    myfw:
+      module: mypackage.myfw_runner
+      class: MyfwRunner
+      provider: openai
+      case_types: [code_generation, websearch]
+"""
+from __future__ import annotations
+import importlib
+import os
+
+FRAMEWORKS: dict[str, dict] = {
+    "crewai": {
+        "module": "frameworks.crewai_runner",
+        "class": "CrewaiRunner",
+        "provider": "openrouter",
+        "case_types": ["code_generation", "code_execution", "websearch"],
+    },
+    "adk": {
+        "module": "frameworks.adk_runner",
+        "class": "AdkRunner",
+        "provider": "google",
+        "case_types": ["code_generation", "code_execution", "websearch"],
+    },
+    "airefinery": {
+        "module": "frameworks.airefinery_runner",
+        "class": "AirefineryRunner",
+        "provider": "airefinery",
+        "case_types": ["code_generation", "code_execution", "websearch"],
+    },
+    # local OpenAI-compatible mock server (common/mock/server.py): offline harness load tests
+    "mock": {
+        "module": "frameworks.mock_runner",
+        "class": "MockRunner",
+        "provider": "mock",
+        "case_types": ["code_generation", "code_execution", "websearch"],
+    },
+}
+
+_loaded_external = False
+
+
+def _manifest() -> dict[str, dict]:
+    global _loaded_external
+    path = os.getenv("AE_FRAMEWORK_MANIFEST")
+    if path and not _loaded_external:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            FRAMEWORKS.update(yaml.safe_load(f) or {})
+        _loaded_external = True
+    return FRAMEWORKS
+
+
+def spec(framework: str) -> dict:
+    """Manifest entry for `framework`; unknown names fall back to the frameworks/<fw>_runner convention."""
+    entry = _manifest().get(framework)
+    if entry is not None:
+        return entry
+    return {
+        "module": f"frameworks.{framework}_runner",
+        "class": f"{framework.capitalize()}Runner",
+        "provider": framework,
+        "case_types": None,  # unknown until imported
+    }
+
+
+def available() -> list[str]:
+    return sorted(_manifest())
+
+
+def supported_case_types(framework: str) -> list[str] | None:
+    """Case types (see the `type:` key of a case YAML) the runner has an arun_<type> method for."""
+    return spec(framework).get("case_types")
+
+
+def providers() -> dict[str, str]:
+    return {name: entry.get("provider", name) for name, entry in _manifest().items()}
+
+
+def load_runner_class(framework: str) -> type:
+    """Import the runner module (and with it the framework SDK) and return the runner class."""
+    entry = spec(framework)
+    module = importlib.import_module(entry["module"])
+    return getattr(module, entry["class"])
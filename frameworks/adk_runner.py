@@ -1,16 +1,36 @@
 import os
-import asyncio
+import uuid
+from typing import Callable
 from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
+from google.adk.models.registry import LLMRegistry
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.code_executors import BuiltInCodeExecutor
 from google.adk.tools import google_search
 from google.genai import types  # needed to construct messages
 
+from common.utils import rate_limit, timing, usage
+from common.utils.event_loop import run_sync
+from common.utils.object_cache import LRUCache, object_key
+
 
 class AdkRunner:
     name = "adk"
 
+    def __init__(self):
+        # Shared across calls: one session store, and one model object (and so one
+        # google.genai client / HTTP pool) per model name, all living on the harness loop.
+        self.session_service = InMemorySessionService()
+        self._models: dict[str, BaseLlm] = {}
+        # LlmAgent + Runner per case type / model / temperature / instruction; sessions stay per-run
+        self._runners = LRUCache()
+
+    def _model(self, model: str) -> BaseLlm:
+        if model not in self._models:
+            self._models[model] = LLMRegistry.new_llm(model)
+        return self._models[model]
+
     async def _collect_response_async(self, runner: Runner, user_prompt: str, session_id: str) -> str:
         """
         Run the agent and collect final response using async API.
@@ -20,8 +40,24 @@ class AdkRunner:
         final_result = None
         stream_accum = []
         code_execution_output = None
+        seen_event = seen_token = False
+        model = runner.agent.model if isinstance(runner.agent.model, str) else getattr(runner.agent.model, "model", None)
 
         async for event in runner.run_async(user_id="user", session_id=session_id, new_message=message):
+            if not seen_event:
+                timing.mark(timing.FIRST_EVENT, author=event.author)
+                seen_event = True
+            for call in event.get_function_calls() or []:
+                timing.mark(timing.TOOL_CALL, tool=call.name)
+            for resp in event.get_function_responses() or []:
+                timing.mark(timing.TOOL_RESULT, tool=resp.name)
+            # every complete model response carries its own usage; partial chunks would double count
+            um = getattr(event, "usage_metadata", None)
+            if um is not None and not getattr(event, "partial", False):
+                usage.record_usage(model=model, prompt_tokens=um.prompt_token_count,
+                                   completion_tokens=um.candidates_token_count,
+                                   tool_tokens=um.tool_use_prompt_token_count, source="adk")
+
             # Debug: Print event details
             print(f"DEBUG EVENT: id={event.id}, author={event.author}, final={event.is_final_response()}")
 
@@ -33,8 +69,15 @@ class AdkRunner:
                         f"code_execution_result={hasattr(part, 'code_execution_result') and part.code_execution_result is not None}, "
                         f"text={hasattr(part, 'text') and part.text is not None}")
 
+                    if getattr(part, "executable_code", None) is not None:
+                        timing.mark(timing.CODE_EXECUTION)
+                    if not seen_token and getattr(part, "text", None):
+                        timing.mark(timing.FIRST_TOKEN)
+                        seen_token = True
+
                     # Check for code execution result
                     if hasattr(part, "code_execution_result") and part.code_execution_result:
+                        timing.mark(timing.CODE_RESULT)
                         code_execution_output = part.code_execution_result.output
                         print(f"  CODE EXECUTION OUTPUT: {code_execution_output}")
                     # Collect streaming text
@@ -43,6 +86,7 @@ class AdkRunner:
                         print(f"  STREAMING TEXT: {part.text[:50]}...")
 
             if event.is_final_response():
+                timing.mark(timing.FINAL_RESPONSE)
                 print(f"FINAL EVENT - code_execution_output: {code_execution_output}")
                 # If we got code execution output, prefer that
                 if code_execution_output:
@@ -63,83 +107,80 @@ class AdkRunner:
 
     def _collect_response(self, runner: Runner, user_prompt: str, session_id: str) -> str:
         """Synchronous wrapper for _collect_response_async."""
-        return asyncio.run(self._collect_response_async(runner, user_prompt, session_id))
-
-    def run_fibonacci(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
-        app_name = "fibonacci"
-        session_id = "session1"
-
-        agent = LlmAgent(
-            name="fibonacci_agent",
-            model=model,
-            instruction=system_prompt,
-        )
-
-        # Create session service
-        session_service = InMemorySessionService()
-
-        # Create session using asyncio
-        asyncio.run(session_service.create_session(
+        return run_sync(self._collect_response_async(runner, user_prompt, session_id))
+
+    async def _arun_agent(self, app_name: str, key: tuple, build_agent: Callable[[], LlmAgent],
+                          system_prompt: str, user_prompt: str) -> str:
+        """Run the agent under the Google rate limiter; a throttled turn is retried in a new session."""
+        return await rate_limit.limiter("google").call(
+            lambda: self._arun_agent_once(app_name, key, build_agent, user_prompt),
+            est_tokens=rate_limit.estimate_tokens(system_prompt, user_prompt))
+
+    async def _arun_agent_once(self, app_name: str, key: tuple, build_agent: Callable[[], LlmAgent],
+                               user_prompt: str) -> str:
+        """Run the (cached) agent once in a fresh session on the shared session service."""
+        session_id = uuid.uuid4().hex
+        await self.session_service.create_session(
             app_name=app_name,
             user_id="user",
             session_id=session_id
-        ))
-
-        # Create runner with the session service
-        runner = Runner(agent=agent, app_name=app_name, session_service=session_service)
-
-        return self._collect_response(runner, user_prompt, session_id=session_id)
-
-    def run_fibonacci_exec(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
-        app_name = "fibonacci_exec"
-        session_id = "session1"
-
-        agent = LlmAgent(
-            name="fibonacci_exec_agent",
-            model=model,
-            instruction=system_prompt,
-            code_executor=BuiltInCodeExecutor(),  # ✅ enable code execution
-
         )
-
-        # Create session service
-        session_service = InMemorySessionService()
-
-        # Create session using asyncio
-        asyncio.run(session_service.create_session(
-            app_name=app_name,
-            user_id="user",
-            session_id=session_id
-        ))
-
-        # Create runner with the session service
-        runner = Runner(agent=agent, app_name=app_name, session_service=session_service)
-
-        return self._collect_response(runner, user_prompt, session_id=session_id)
+        timing.mark(timing.SESSION_CREATED)
+
+        def build() -> Runner:
+            # Create runner with the session service
+            return Runner(agent=build_agent(), app_name=app_name, session_service=self.session_service)
+
+        try:
+            with self._runners.lease(key, build) as runner:
+                timing.mark(timing.CONSTRUCTED)
+                return await self._collect_response_async(runner, user_prompt, session_id=session_id)
+        finally:
+            # sessions are per-run; drop them so the shared store doesn't grow across a sweep
+            await self.session_service.delete_session(app_name=app_name, user_id="user", session_id=session_id)
+
+    async def arun_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        def build() -> LlmAgent:
+            return LlmAgent(
+                name="code_generation_agent",
+                model=self._model(model),
+                instruction=system_prompt,
+            )
+        key = object_key("code_generation", model, temperature, (), system_prompt)
+        return await self._arun_agent("code_generation", key, build, system_prompt, user_prompt)
+
+    async def arun_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        def build() -> LlmAgent:
+            return LlmAgent(
+                name="code_execution_agent",
+                model=self._model(model),
+                instruction=system_prompt,
+                code_executor=BuiltInCodeExecutor(),  # ✅ enable code execution
+
+            )
+        key = object_key("code_execution", model, temperature, ("built_in_code_executor",), system_prompt)
+        return await self._arun_agent("code_execution", key, build, system_prompt, user_prompt)
+
+    async def arun_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        def build() -> LlmAgent:
+            return LlmAgent(
+                name="websearch_agent",
+                model=self._model(model),
+                instruction=system_prompt,
+                tools=[google_search],   # ✅ enable Google Search tool
+            )
+        key = object_key("websearch", model, temperature, ("google_search",), system_prompt)
+        return await self._arun_agent("websearch", key, build, system_prompt, user_prompt)
+
+    def run_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_generation(system_prompt, user_prompt, model, temperature))
+
+    def run_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_execution(system_prompt, user_prompt, model, temperature))
 
     def run_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
-        app_name = "websearch"
-        session_id = "session1"
-
-        agent = LlmAgent(
-            name="websearch_agent",
-            model=model,
-            instruction=system_prompt,
-            tools=[google_search],   # ✅ enable Google Search tool
-        )
-
-        # Create session service
-        session_service = InMemorySessionService()
-
-        # Create session
-        asyncio.run(session_service.create_session(
-            app_name=app_name,
-            user_id="user",
-            session_id=session_id
-        ))
-
-        # Create runner
-        runner = Runner(agent=agent, app_name=app_name, session_service=session_service)
+        return run_sync(self.arun_websearch(system_prompt, user_prompt, model, temperature))
 
-        # Collect response
-        return self._collect_response(runner, user_prompt, session_id=session_id)
+    # case-name aliases from before dispatch by case type
+    run_fibonacci = run_code_generation
+    run_fibonacci_exec = run_code_execution
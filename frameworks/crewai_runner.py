@@ -1,85 +1,167 @@
 from __future__ import annotations
+import os
 from crewai import Agent, Task, Crew, LLM
 from crewai_tools import CodeInterpreterTool, SerperDevTool
 
+from common.utils import rate_limit, timing, usage
+from common.utils.event_loop import run_sync
+from common.utils.object_cache import LRUCache, object_key
+
+# OpenAI-compatible endpoint for LLM(); point it at the local mock server for offline runs
+BASE_URL = os.getenv("AE_CREWAI_BASE_URL", "https://openrouter.ai/api/v1")
+LIMIT_KEY = rate_limit.key_for("openrouter", os.getenv("AE_CREWAI_BASE_URL"))
+
+
+def _step_recorder():
+    """Crew step_callback that marks first-step and tool events on the current timeline."""
+    # crewai may invoke callbacks off the calling thread, so bind the timeline now
+    tl = timing.current()
+    seen = []
+
+    def on_step(step) -> None:
+        if tl is None:
+            return
+        if not seen:
+            tl.mark(timing.FIRST_EVENT)
+            seen.append(True)
+        tool = getattr(step, "tool", None)
+        if tool:
+            tl.mark(timing.TOOL_CALL, tool=str(tool))
+            if getattr(step, "result", None) is not None:
+                tl.mark(timing.TOOL_RESULT, tool=str(tool))
+
+    return on_step
+
+
+async def _kickoff(crew: Crew, model: str) -> str:
+    timing.mark(timing.CONSTRUCTED)
+
+    async def run():
+        # kickoff_async runs the (blocking) crew in a worker thread, off the shared loop
+        result = await crew.kickoff_async()
+        # CrewOutput.token_usage sums the LLM usage of every agent step in the crew; recorded
+        # inside the limited call so the limiter charges the crew's real tokens and requests
+        metrics = getattr(result, "token_usage", None) or getattr(crew, "usage_metrics", None)
+        if metrics is not None:
+            usage.record_usage(model=model, prompt_tokens=metrics.prompt_tokens,
+                               completion_tokens=metrics.completion_tokens, source="crewai",
+                               requests=getattr(metrics, "successful_requests", None) or 1)
+        return result
+
+    # a throttled kickoff is retried as a whole; per-step usage comes from the successful run
+    est = rate_limit.estimate_tokens(*(str(a.goal) for a in crew.agents), *(str(t.description) for t in crew.tasks))
+    result = await rate_limit.limiter(LIMIT_KEY).call(run, est_tokens=est)
+    timing.mark(timing.FINAL_RESPONSE)
+    return str(result).strip()
+
 
 class CrewaiRunner:
     name = "crewai"
 
-    def run_fibonacci(self, system_prompt: str, user_prompt: str, model: str, temperature: float
-                      ) -> str:
-        # Note: CrewAI will use the model configured in your env (e.g., OPENAI_API_KEY).
-        llm = LLM(
-            model=model,
-            temperature=temperature,
-            # api_key=settings.openai_api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        agent = Agent(
-            role="Python Coder",
-            goal=system_prompt,
-            backstory="Writes small, correct Python snippets.",
-            allow_delegation=False,
-            verbose=False,
-            llm=llm,
-        )
-        task = Task(
-            description=user_prompt,
-            agent=agent,
-            expected_output="Return only a Python fenced code block (```python ... ```)."
-        )
-        crew = Crew(agents=[agent], tasks=[task])
-        return str(crew.kickoff()).strip()
-
-    def run_fibonacci_exec(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
-        llm = LLM(
-            model=model,
-            temperature=temperature,
-            # api_key=settings.openai_api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        agent = Agent(
-            role="Python Programmer",
-            goal=system_prompt,
-            backstory="An expert Python programmer who can write efficient code to solve complex problems.",
-            allow_delegation=False,
-            verbose=True,
-            tools=[CodeInterpreterTool()],  # ✅ execution tool
-            llm=llm,
-        )
-        task = Task(
-            description=user_prompt,
-            agent=agent,
-            expected_output="The Fibonacci sequence up to the 10th number.",
-        )
-        crew = Crew(agents=[agent], tasks=[task])
-        return str(crew.kickoff()).strip()
+    def __init__(self):
+        # LLM + Agent (+ tool instances) per case type / model / temperature / goal; Task and Crew,
+        # which carry the per-run state, are still built fresh for every call
+        self._agents = LRUCache()
+
+    async def arun_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float
+                                   ) -> str:
+        def build() -> Agent:
+            # Note: CrewAI will use the model configured in your env (e.g., OPENAI_API_KEY).
+            llm = LLM(
+                model=model,
+                temperature=temperature,
+                # api_key=settings.openai_api_key,
+                base_url=BASE_URL
+            )
+            return Agent(
+                role="Python Coder",
+                goal=system_prompt,
+                backstory="Writes small, correct Python snippets.",
+                allow_delegation=False,
+                verbose=False,
+                llm=llm,
+            )
+
+        key = object_key("code_generation", model, temperature, (), system_prompt)
+        with self._agents.lease(key, build) as agent:
+            task = Task(
+                description=user_prompt,
+                agent=agent,
+                expected_output="Return only a Python fenced code block (```python ... ```)."
+            )
+            crew = Crew(agents=[agent], tasks=[task], step_callback=_step_recorder())
+            return await _kickoff(crew, model)
+
+    async def arun_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        def build() -> Agent:
+            llm = LLM(
+                model=model,
+                temperature=temperature,
+                # api_key=settings.openai_api_key,
+                base_url=BASE_URL
+            )
+            return Agent(
+                role="Python Programmer",
+                goal=system_prompt,
+                backstory="An expert Python programmer who can write efficient code to solve complex problems.",
+                allow_delegation=False,
+                verbose=True,
+                tools=[CodeInterpreterTool()],  # ✅ execution tool
+                llm=llm,
+            )
+
+        key = object_key("code_execution", model, temperature, ("code_interpreter",), system_prompt)
+        with self._agents.lease(key, build) as agent:
+            task = Task(
+                description=user_prompt,
+                agent=agent,
+                expected_output="The output printed by the executed code, as plain text.",
+            )
+            crew = Crew(agents=[agent], tasks=[task], step_callback=_step_recorder())
+            return await _kickoff(crew, model)
+
+    async def arun_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        def build() -> Agent:
+            # Configure search tool (requires SERPER_API_KEY in env)
+            search_tool = SerperDevTool()
+
+            llm = LLM(
+                model=model,
+                temperature=temperature,
+                base_url=BASE_URL
+            )
+
+            return Agent(
+                role="Research Assistant",
+                goal=system_prompt,
+                backstory="An assistant who researches online and provides clear summaries.",
+                allow_delegation=False,
+                verbose=True,
+                tools=[search_tool],
+                llm=llm,
+            )
+
+        key = object_key("websearch", model, temperature, ("serper",), system_prompt)
+        with self._agents.lease(key, build) as agent:
+            task = Task(
+                description=user_prompt,
+                agent=agent,
+                # like the other runners, everything case-specific comes from the instance's prompts
+                expected_output=f"A concise summary of the search results that answers: {user_prompt.strip()}",
+            )
+
+            crew = Crew(agents=[agent], tasks=[task], step_callback=_step_recorder())
+            return await _kickoff(crew, model)
+
+    def run_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_generation(system_prompt, user_prompt, model, temperature))
+
+    def run_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_execution(system_prompt, user_prompt, model, temperature))
 
     def run_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
-        # Configure search tool (requires SERPER_API_KEY in env)
-        search_tool = SerperDevTool()
-
-        llm = LLM(
-            model=model,
-            temperature=temperature,
-            base_url="https://openrouter.ai/api/v1"
-        )
-
-        agent = Agent(
-            role="Research Assistant",
-            goal=system_prompt,
-            backstory="An assistant who researches online and provides clear summaries.",
-            allow_delegation=False,
-            verbose=True,
-            tools=[search_tool],
-            llm=llm,
-        )
-
-        task = Task(
-            description=user_prompt,
-            agent=agent,
-            expected_output="A concise 3–5 sentence summary including the words 'Starship' and 'SpaceX'."
-        )
-
-        crew = Crew(agents=[agent], tasks=[task])
-        return str(crew.kickoff()).strip()
\ No newline at end of file
+        return run_sync(self.arun_websearch(system_prompt, user_prompt, model, temperature))
+
+    # case-name aliases from before dispatch by case type
+    run_fibonacci = run_code_generation
+    run_fibonacci_exec = run_code_execution
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+from common.utils import rate_limit, timing, usage
+from common.utils.event_loop import run_sync
+
+WEB_SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "web_search",
+        "description": "Search the web and return result snippets.",
+        "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]},
+    },
+}
+
+
+class MockHTTPError(RuntimeError):
+    """Non-2xx answer from the mock server (carries the status and headers, like provider SDK errors)."""
+
+    def __init__(self, status_code: int, headers: dict, body: str):
+        super().__init__(f"HTTP {status_code}: {body[:200]}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+class MockRunner:
+    """
+    Runner for the local mock LLM server (common/mock/server.py).
+
+    Talks plain OpenAI chat-completions over HTTP with no SDK in between, so sweeps and load
+    tests against it measure the harness itself. Uses $AE_MOCK_BASE_URL when set, otherwise
+    starts an in-process mock server on a free port.
+    """
+    name = "mock"
+
+    def __init__(self):
+        url = os.getenv("AE_MOCK_BASE_URL")
+        self._server = None
+        if not url:
+            from common.mock.server import start_server, base_url
+            self._server = start_server()
+            url = base_url(self._server)
+        self._limit_key = rate_limit.key_for("mock", os.getenv("AE_MOCK_BASE_URL"))
+        parts = urlsplit(url.rstrip("/"))
+        self._host, self._port, self._prefix = parts.hostname, parts.port or 80, parts.path
+        self._local = threading.local()  # one keep-alive connection per worker thread
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self._host, self._port, timeout=300)
+        return conn
+
+    def _chat_blocking(self, messages: list, model: str, temperature: float, tools: list | None) -> dict:
+        body = {"model": model, "messages": messages, "temperature": temperature, "stream": True,
+                "stream_options": {"include_usage": True}}
+        if tools:
+            body["tools"] = tools
+        conn = self._conn()
+        try:
+            conn.request("POST", f"{self._prefix}/chat/completions", body=json.dumps(body),
+                         headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+        except (ConnectionError, http.client.HTTPException):
+            # stale keep-alive connection: reconnect once
+            conn.close()
+            self._local.conn = None
+            conn = self._conn()
+            conn.request("POST", f"{self._prefix}/chat/completions", body=json.dumps(body),
+                         headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+
+        if resp.status >= 400:
+            text = resp.read().decode("utf-8", "replace")
+            raise MockHTTPError(resp.status, dict(resp.getheaders()), text)
+
+        content, tool_calls, used = [], [], None
+        first = True
+        for raw in resp:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if first:
+                timing.mark(timing.FIRST_EVENT)
+            used = chunk.get("usage") or used
+            for choice in chunk.get("choices") or []:
+                delta = choice.get("delta") or {}
+                if delta.get("content"):
+                    if not content:
+                        timing.mark(timing.FIRST_TOKEN)
+                    content.append(delta["content"])
+                tool_calls.extend(delta.get("tool_calls") or [])
+            first = False
+        if resp.getheader("Connection", "").lower() == "close":
+            conn.close()
+            self._local.conn = None
+        if used:
+            usage.record_usage(model=model, prompt_tokens=used.get("prompt_tokens"),
+                               completion_tokens=used.get("completion_tokens"), source="mock")
+        return {"content": "".join(content), "tool_calls": tool_calls}
+
+    async def _chat(self, messages: list, model: str, temperature: float, tools: list | None = None) -> dict:
+        # http.client blocks, so each call runs on a worker thread (context, and so timing, follows)
+        est = rate_limit.estimate_tokens(*(m.get("content") or "" for m in messages))
+        return await rate_limit.limiter(self._limit_key).call(
+            lambda: asyncio.to_thread(self._chat_blocking, messages, model, temperature, tools), est_tokens=est)
+
+    async def arun_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        timing.mark(timing.CONSTRUCTED)
+        out = await self._chat(messages, model, temperature)
+        timing.mark(timing.FINAL_RESPONSE)
+        return out["content"].strip()
+
+    async def arun_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        timing.mark(timing.CONSTRUCTED)
+        out = (await self._chat(messages, model, temperature))["content"].strip()
+        if "```" in out:
+            # the model answered with code: execute it locally, as the AI Refinery runner does
+            from common.evaluators import python_code_eval
+            timing.mark(timing.CODE_EXECUTION)
+            result = await asyncio.to_thread(python_code_eval.evaluate_code_output, out, [])
+            timing.mark(timing.CODE_RESULT)
+            out = str(result.get("stdout") or result.get("got")).strip()
+        timing.mark(timing.FINAL_RESPONSE)
+        return out
+
+    async def arun_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        timing.mark(timing.CONSTRUCTED)
+        out = await self._chat(messages, model, temperature, tools=[WEB_SEARCH_TOOL])
+        if out["tool_calls"]:
+            messages.append({"role": "assistant", "content": None, "tool_calls": out["tool_calls"]})
+            for call in out["tool_calls"]:
+                name = call["function"]["name"]
+                timing.mark(timing.TOOL_CALL, tool=name)
+                # canned search result: the mock server scripts the final answer anyway
+                result = json.dumps({"results": [{"title": "mock result", "snippet": call["function"]["arguments"]}]})
+                timing.mark(timing.TOOL_RESULT, tool=name)
+                messages.append({"role": "tool", "tool_call_id": call.get("id"), "content": result})
+            out = await self._chat(messages, model, temperature, tools=[WEB_SEARCH_TOOL])
+        timing.mark(timing.FINAL_RESPONSE)
+        return out["content"].strip()
+
+    def run_code_generation(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_generation(system_prompt, user_prompt, model, temperature))
+
+    def run_code_execution(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_code_execution(system_prompt, user_prompt, model, temperature))
+
+    def run_websearch(self, system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+        return run_sync(self.arun_websearch(system_prompt, user_prompt, model, temperature))
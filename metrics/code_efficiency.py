@@ -0,0 +1,43 @@
+from common.evaluators.python_code_eval import DEFAULT_CPU_LIMIT, profile_code
+from metrics.registry import metric
+
+def score(code: str, spec: dict) -> dict:
+    """
+    spec (case expectations `efficiency`): {entrypoint: <function name>, sizes: [n1, n2, ...],
+    report_size: optional (default: smallest size), cpu_limit_s: optional, mem_limit_mb: optional}.
+    """
+    kwargs = {}
+    if spec.get("cpu_limit_s"):
+        kwargs["cpu_s"] = float(spec["cpu_limit_s"])
+    if spec.get("mem_limit_mb"):
+        kwargs["mem_mb"] = int(spec["mem_limit_mb"])
+    sizes = list(spec.get("sizes") or [])
+    report_size = spec.get("report_size", min(sizes, default=None))
+    prof = profile_code(code, spec["entrypoint"], sizes, **kwargs)
+    # CPU time at one declared size, so outputs are compared like for like; a run that hit the
+    # CPU limit there is censored at the limit
+    at_size = next((r for r in prof["runs"] if r["size"] == report_size), None)
+    if at_size is not None:
+        cpu_at_size = at_size["cpu_s"]
+    elif prof["limit_hit"] == "cpu" and prof["limit_size"] == report_size:
+        cpu_at_size = kwargs.get("cpu_s", DEFAULT_CPU_LIMIT)
+    else:
+        cpu_at_size = None
+    return {
+        # empirical exponent of CPU time vs input size (lower is better); None if it couldn't be fitted
+        "code_efficiency": prof["scaling_exponent"],
+        # 1.0 when the code ran into the CPU or memory limit before the largest size: it scales worse
+        # than the sizes allow, even when too few sizes finished to fit an exponent
+        "code_efficiency_limited": 1.0 if prof["limit_hit"] else 0.0,
+        "code_cpu_s": cpu_at_size,
+        "code_peak_rss_kb": prof["peak_rss_kb"],
+        "code_efficiency_details": dict(prof, report_size=report_size),
+    }
+
+@metric("code_efficiency", requires=("code_block",))
+def from_context(ctx) -> dict:
+    spec = ctx.expectations.get("efficiency")
+    if not spec or not spec.get("entrypoint"):
+        return {"code_efficiency": None,
+                "code_efficiency_details": {"ok": False, "error": "case has no expectations.efficiency.entrypoint"}}
+    return score(ctx.get("code_block"), spec)
@@ -1,8 +1,116 @@
-from common.evaluators.python_code_eval import evaluate_code_output
+from __future__ import annotations
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
 
-def score(output_text: str, expected_sequence: list[int]) -> dict:
-    ev = evaluate_code_output(output_text, expected_sequence)
+from common.utils.usage import totals
+from metrics.registry import metric
+
+PRICE_TABLE = Path(__file__).parent.parent / "common" / "pricing.yaml"
+
+# metrics that count as a "correct answer" for tokens/cost-per-correct
+CORRECTNESS_METRICS = ("functional_correctness", "sequence_correctness", "success_keywords")
+
+
+@lru_cache(maxsize=None)
+def load_prices(path: str = str(PRICE_TABLE)) -> dict:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        table = yaml.safe_load(f) or {}
+    table["models"] = {str(k).lower(): v for k, v in (table.get("models") or {}).items()}
+    return table
+
+def price_for(model: str | None, table: dict | None = None) -> dict | None:
+    table = table or load_prices()
+    if not model:
+        return None
+    models = table["models"]
+    name = model.lower()
+    if name in models:
+        return models[name]
+    # drop provider prefixes: openrouter/openai/gpt-4o -> gpt-4o
+    short = name.rsplit("/", 1)[-1]
+    return models.get(short)
+
+def score(usage_records: list[dict] | None, default_model: str | None = None) -> dict:
+    if not usage_records:
+        # runner reported no usage (e.g. a distiller call): nothing to price
+        return {}
+    table = load_prices()
+    cost, unpriced = 0.0, set()
+    for r in usage_records:
+        model = r.get("model") or default_model
+        p = price_for(model, table)
+        if p is None:
+            unpriced.add(model)
+            continue
+        cost += ((r["prompt_tokens"] + r["tool_tokens"]) * p["prompt"]
+                 + r["completion_tokens"] * p["completion"]) / table.get("per_tokens", 1_000_000)
+    tok = totals(usage_records)
     return {
-        "functional_correctness": 1.0 if ev["ok"] else 0.0,
-        "functional_correctness_details": ev,
+        "cost": cost if not unpriced else None,
+        "tokens_total": tok["total_tokens"],
+        "cost_details": {
+            **tok,
+            "currency": table.get("currency", "USD"),
+            "price_table_version": table.get("version"),
+            "unpriced_models": sorted(m or "?" for m in unpriced),
+        },
     }
+
+@metric("cost")
+def from_context(ctx) -> dict:
+    return score(ctx.usage, ctx.model)
+
+
+def summarize_costs(results: list[dict]) -> dict:
+    """
+    Aggregate tokens and cost per (case, framework, model).
+
+    A run is correct when it scored 1.0 on every correctness metric its group's case is scored
+    on (those any run of the group reports); a run missing one of them is not correct.
+    """
+    agg = defaultdict(lambda: {"runs": 0, "correct": 0, "tokens": 0, "cost": 0.0, "latency": 0.0, "priced": True})
+    scored = [r for r in results if "tokens_total" in (r.get("metrics") or {})]
+    required = defaultdict(set)
+    for r in scored:
+        required[(r["case"], r["framework"], r.get("model"))].update(k for k in CORRECTNESS_METRICS if k in r["metrics"])
+    for r in scored:
+        m = r["metrics"]
+        key = (r["case"], r["framework"], r.get("model"))
+        a = agg[key]
+        a["runs"] += 1
+        a["correct"] += int(bool(required[key]) and all(m.get(k) == 1.0 for k in required[key]))
+        a["tokens"] += m["tokens_total"]
+        a["latency"] += m.get("latency") or 0.0
+        if m.get("cost") is None:
+            a["priced"] = False
+        else:
+            a["cost"] += m["cost"]
+    out = {}
+    for key, a in agg.items():
+        cost = a["cost"] if a["priced"] else None
+        out[key] = {
+            "runs": a["runs"],
+            "correct": a["correct"],
+            "tokens": a["tokens"],
+            "cost": cost,
+            "tokens_per_correct": a["tokens"] / a["correct"] if a["correct"] else None,
+            "cost_per_correct": cost / a["correct"] if cost is not None and a["correct"] else None,
+            "cost_per_second": cost / a["latency"] if cost is not None and a["latency"] else None,
+        }
+    return out
+
+def format_cost_summary(summary: dict) -> str:
+    def fmt(v, spec, prefix=""):
+        return "n/a" if v is None else prefix + format(v, spec)
+
+    lines = ["\n=== COST ==="]
+    for (case_name, fw, model), s in summary.items():
+        lines.append(f"  {case_name} | {fw} | {model}: runs={s['runs']} correct={s['correct']} "
+                     f"tokens={s['tokens']} cost={fmt(s['cost'], '.6f', '$')} "
+                     f"tokens/correct={fmt(s['tokens_per_correct'], '.1f')} "
+                     f"cost/correct={fmt(s['cost_per_correct'], '.6f', '$')} "
+                     f"cost/s={fmt(s['cost_per_second'], '.6f', '$')}")
+    return "\n".join(lines)
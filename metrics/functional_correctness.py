@@ -1,8 +1,15 @@
 from common.evaluators.python_code_eval import evaluate_code_output
+from metrics.registry import metric
 
-def score(output_text: str, expected_sequence: list[int]) -> dict:
-    ev = evaluate_code_output(output_text, expected_sequence)
+def _as_scores(ev: dict) -> dict:
     return {
         "functional_correctness": 1.0 if ev["ok"] else 0.0,
         "functional_correctness_details": ev,
     }
+
+def score(output_text: str, expected_sequence: list[int]) -> dict:
+    return _as_scores(evaluate_code_output(output_text, expected_sequence))
+
+@metric("functional_correctness", requires=("code_eval",))
+def from_context(ctx) -> dict:
+    return _as_scores(ctx.get("code_eval"))
@@ -1,2 +1,21 @@
-def as_metric(latency_seconds: float) -> dict:
-    return {"latency": latency_seconds}
+from common.utils.timing import breakdown
+from metrics.registry import metric
+
+def as_metric(latency_seconds: float, events: list[dict] | None = None) -> dict:
+    scores = {"latency": latency_seconds}
+    if events:
+        parts = breakdown(events, latency_seconds)
+        scores["latency_breakdown"] = parts
+        # rate-limit waits and retries are reported separately, not as model latency
+        overhead = parts["throttle_wait_s"] + parts["retry_s"]
+        if overhead > 0:
+            scores["latency"] = max(0.0, latency_seconds - overhead)
+            scores["latency_wall"] = latency_seconds
+    return scores
+
+@metric("latency")
+def from_context(ctx) -> dict:
+    if ctx.elapsed is None:
+        # the call didn't complete; leave it out of the latency statistics
+        return {"latency": None}
+    return as_metric(ctx.elapsed, ctx.timings)
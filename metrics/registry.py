@@ -0,0 +1,96 @@
+from __future__ import annotations
+import importlib
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from common.evaluators import python_code_eval, sequence_match
+from common.utils import tracing
+
+# name -> producer(ctx) for intermediate artifacts shared between metrics
+_ARTIFACTS: Dict[str, Callable[["ScoringContext"], Any]] = {}
+# name -> (requires, scorer(ctx) -> dict)
+_METRICS: Dict[str, Tuple[Tuple[str, ...], Callable[["ScoringContext"], dict]]] = {}
+
+
+def artifact(name: str):
+    """Register a producer for a shared artifact (computed at most once per output)."""
+    def deco(fn):
+        _ARTIFACTS[name] = fn
+        return fn
+    return deco
+
+
+def metric(name: str, requires: Iterable[str] = ()):
+    """Register a metric scorer and the artifacts it reads from the context."""
+    def deco(fn):
+        _METRICS[name] = (tuple(requires), fn)
+        return fn
+    return deco
+
+
+class ScoringContext:
+    """Everything metrics may look at for one output, with memoized artifacts."""
+
+    def __init__(self, output_text: str, expectations: dict | None = None, elapsed: float | None = None,
+                 timings: List[dict] | None = None, usage: List[dict] | None = None, model: str | None = None):
+        self.output_text = output_text or ""
+        self.expectations = expectations or {}
+        self.elapsed = elapsed
+        self.timings = timings or []
+        self.usage = usage or []
+        self.model = model
+        self._artifacts: Dict[str, Any] = {}
+
+    def get(self, name: str) -> Any:
+        if name not in self._artifacts:
+            if name not in _ARTIFACTS:
+                raise KeyError(f"Unknown artifact '{name}'")
+            with tracing.span(f"artifact:{name}", cat="metric"):
+                self._artifacts[name] = _ARTIFACTS[name](self)
+        return self._artifacts[name]
+
+
+def get_metric(name: str) -> Tuple[Tuple[str, ...], Callable[[ScoringContext], dict]]:
+    """Look a metric up by name, importing metrics.<name> on first use."""
+    if name not in _METRICS:
+        try:
+            importlib.import_module(f"metrics.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"metrics.{name}":
+                raise
+        if name not in _METRICS:
+            raise KeyError(f"Unknown metric '{name}' (expected a @metric('{name}') scorer in metrics/{name}.py)")
+    return _METRICS[name]
+
+
+def score_all(metric_names: List[str], ctx: ScoringContext) -> dict:
+    scores: dict = {}
+    for name in metric_names:
+        requires, scorer = get_metric(name)
+        with tracing.span(f"metric:{name}", cat="metric"):
+            for a in requires:
+                ctx.get(a)
+            scores.update(scorer(ctx))
+    return scores
+
+
+# --- shared artifacts -------------------------------------------------------
+
+@artifact("code_block")
+def _code_block(ctx: ScoringContext) -> str:
+    return python_code_eval._extract_code_block(ctx.output_text)
+
+
+@artifact("sandbox_result")
+def _sandbox_result(ctx: ScoringContext) -> dict:
+    return python_code_eval._run_code_with_timeout(ctx.get("code_block"))
+
+
+@artifact("code_eval")
+def _code_eval(ctx: ScoringContext) -> dict:
+    expected_seq = ctx.expectations.get("expected_sequence") or []
+    return python_code_eval._compare_stdout(ctx.get("sandbox_result"), expected_seq)
+
+
+@artifact("output_ints")
+def _output_ints(ctx: ScoringContext) -> List[int]:
+    return sequence_match.parse_ints(ctx.output_text)
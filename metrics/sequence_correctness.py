@@ -1,8 +1,16 @@
-from common.evaluators.sequence_match import evaluate
+from common.evaluators.sequence_match import evaluate, evaluate_ints
+from metrics.registry import metric
 
-def score(output_text: str, expected_sequence: list[int]) -> dict:
-    ev = evaluate(output_text, expected_sequence)
+def _as_scores(ev: dict) -> dict:
     return {
         "sequence_correctness": 1.0 if ev["ok"] else 0.0,
         "sequence_correctness_details": ev,
     }
+
+def score(output_text: str, expected_sequence: list[int]) -> dict:
+    return _as_scores(evaluate(output_text, expected_sequence))
+
+@metric("sequence_correctness", requires=("output_ints",))
+def from_context(ctx) -> dict:
+    expected_seq = ctx.expectations.get("expected_sequence") or []
+    return _as_scores(evaluate_ints(ctx.get("output_ints"), expected_seq))
@@ -1,3 +1,21 @@
-def score(output_text: str, required_keywords: list[str]) -> dict:
-    ok = all(k in (output_text or "") for k in (required_keywords or []))
+from typing import List
+
+from common.evaluators.text_match import keyword_matcher
+from metrics.registry import metric
+
+def score(output_text: str, required_keywords: list[str], ignore_case: bool = False, normalized: bool = False) -> dict:
+    matcher = keyword_matcher(tuple(required_keywords or ()), ignore_case, normalized)
+    ok = matcher.all_present(output_text or "")
     return {"success_keywords": 1.0 if ok else 0.0}
+
+def score_many(output_texts: List[str], required_keywords: list[str], ignore_case: bool = False,
+               normalized: bool = False) -> List[dict]:
+    """`score` for a batch of outputs of one case; the keyword matcher is built once."""
+    matcher = keyword_matcher(tuple(required_keywords or ()), ignore_case, normalized)
+    return [{"success_keywords": 0.0 if missing else 1.0} for missing in matcher.missing_many(output_texts)]
+
+@metric("success_keywords")
+def from_context(ctx) -> dict:
+    exp = ctx.expectations
+    return score(ctx.output_text, exp.get("contains", []),
+                 ignore_case=bool(exp.get("contains_ignore_case")), normalized=bool(exp.get("contains_normalized")))
@@ -5,93 +5,560 @@ os.environ["OTEL_SDK_DISABLED"] = "true"
 os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
 os.environ["CREWAI_DISABLE_TRACKING"] = "true"
 
-import argparse, importlib, time
-from common.utils.prompt_builder import load_case, get_prompts, get_llm_config
-from metrics import latency as m_latency
-from metrics import success_keywords as m_keywords
-from metrics import functional_correctness as m_correct
-from metrics import tool_usage as m_tool
-from metrics import cost as m_cost
-from dotenv import load_dotenv
+import argparse, sys, threading, time
+import frameworks as fw_manifest
+from common.utils.prompt_builder import (load_case, get_prompts, get_llm_config, case_type,
+                                        iter_case_instances)
+from common.utils.scheduler import MatrixScheduler, parse_limits
+from common.utils.response_store import ResponseStore, response_key
+from common.utils.results_sink import (JsonlSink, best_results, cell_key, completed_cells, config_hash,
+                                       merge_results)
+from common.utils.sharding import WorkQueue, parse_shard, shard_of
+from common.utils import timing, tracing, usage
 
-# load .env if present
-load_dotenv()
+# Heavier modules (dotenv, asyncio loop, numpy stats, metric evaluators, framework SDKs)
+# are imported where they are first needed, so `--help`, `--list-frameworks` and
+# replay-only runs start fast.
 
 
-def run_case_framework(case_name: str, framework: str) -> dict:
-    case = load_case(case_name)
-    system_prompt, user_prompt = get_prompts(case)
-    temperature, model_name = get_llm_config(case)
+_RUNNERS: dict[str, object] = {}
+_RUNNERS_LOCK = threading.Lock()
+
+
+def get_runner(framework: str) -> tuple[object, float]:
+    """
+    Return the shared runner instance for `framework` and how long building it took
+    (0.0 when reused). Runners keep their SDK clients and session services between
+    cells, so later cases and repetitions reuse warm connections.
+    """
+    with _RUNNERS_LOCK:
+        if framework in _RUNNERS:
+            return _RUNNERS[framework], 0.0
+        # Load framework runner class (this is where the SDK gets imported): e.g. frameworks.crewai_runner.CrewaiRunner
+        t_init = time.perf_counter()
+        with tracing.span("runner_init", cat="runner", runner=framework):
+            runner = fw_manifest.load_runner_class(framework)()
+        _RUNNERS[framework] = runner
+        return runner, time.perf_counter() - t_init
+
+
+def _call_runner(kind: str, framework: str, system_prompt: str, user_prompt: str,
+                 model_name: str, temperature: float, timeout: float | None = None, hedge: bool = False) -> dict:
+    """
+    Call the framework once; returns the raw call record (output, elapsed, timings, usage).
+
+    With `timeout` the call is cancelled at the deadline and the record carries an `error`
+    and empty output instead of raising; with `hedge` a slow call gets a duplicate (see
+    common/utils/deadlines.py) and the record carries the hedge outcome.
+    """
+    runner, runner_init_s = get_runner(framework)
+
+    # Case-type method pattern: arun_<type> (preferred, driven on the shared loop) or run_<type>
+    arun_func = getattr(runner, f"arun_{kind}", None)
+    run_func = getattr(runner, f"run_{kind}", None)
+    if arun_func is None and run_func is None:
+        raise NotImplementedError(f"{type(runner).__name__} does not implement arun_{kind}() or run_{kind}()")
 
-    # Load framework runner class: e.g., frameworks.crewai_runner.CrewAIRunner
-    module = importlib.import_module(f"frameworks.{framework}_runner")
-    class_name = f"{framework.capitalize()}Runner"
-    runner = getattr(module, class_name)()
-
-    # Case-specific method pattern: run_<case>
-    method_name = f"run_{case_name}"
-    if not hasattr(runner, method_name):
-        raise NotImplementedError(f"{class_name} does not implement {method_name}()")
-
-    run_func = getattr(runner, method_name)
-
-    # Measure latency
-    t0 = time.perf_counter()
-    output_text = run_func(system_prompt, user_prompt, model_name, temperature)
-    t1 = time.perf_counter()
-    elapsed = t1 - t0
-
-    # Build metrics from case.yaml
-    expectations = case.get("expectations", {}) or {}
-    metric_list = case.get("metrics", []) or []
-
-    scores = {}
-    for m in metric_list:
-        if m == "latency":
-            scores.update(m_latency.as_metric(elapsed))
-        elif m == "success_keywords":
-            scores.update(m_keywords.score(output_text, expectations.get("contains", [])))
-        elif m == "functional_correctness":
-            expected_seq = expectations.get("expected_sequence") or []
-            scores.update(m_correct.score(output_text, expected_seq))
-        elif m == "tool_usage":
-            scores.update(m_tool.score(output_text))
-        elif m == "sequence_correctness":
-            from metrics import sequence_correctness as m_seq
-            expected_seq = expectations.get("expected_sequence") or []
-            scores.update(m_seq.score(output_text, expected_seq))
-
-        # elif m == "cost":
-        #     scores.update(m_cost.score(None))
-
-    return {
-        "case": case_name,
-        "framework": framework,
+    from common.utils import event_loop
+
+    def factory():
+        if arun_func is not None:
+            return arun_func(system_prompt, user_prompt, model_name, temperature)
+        # sync-only runners can be abandoned at the deadline but not interrupted
+        import asyncio
+        return asyncio.to_thread(run_func, system_prompt, user_prompt, model_name, temperature)
+
+    # Measure latency; runners mark construction / first event / tool / final events on the timeline
+    # and report provider token usage on the usage meter
+    error = hedge_outcome = None
+    with tracing.span("runner_call", cat="llm", runner=framework, model=model_name), \
+            timing.record() as tl, usage.record() as meter:
+        t0 = time.perf_counter()
+        from common.utils.rate_limit import RetriesExhausted
+        try:
+            if timeout is not None or hedge:
+                import asyncio
+                from common.utils import deadlines
+                try:
+                    output_text, hedge_outcome = event_loop.run_sync(
+                        deadlines.call(factory, f"{framework}|{model_name}", timeout=timeout, hedge=hedge))
+                except asyncio.TimeoutError:
+                    output_text, error = "", f"deadline exceeded after {timeout:g}s"
+            elif arun_func is not None:
+                output_text = event_loop.run_sync(factory())
+            else:
+                output_text = run_func(system_prompt, user_prompt, model_name, temperature)
+        except RetriesExhausted as e:
+            # the provider kept throttling / failing: this cell fails, the sweep goes on
+            output_text, error = "", str(e)
+        t1 = time.perf_counter()
+    tracing.timeline_events(tl, framework)
+    # runner instantiation happens before the call starts, hence the negative offset
+    events = [{"event": timing.RUNNER_INIT, "t": -runner_init_s, "duration_s": runner_init_s}] + tl.events
+    record = {
         "output": output_text,
-        "metrics": scores,
+        "elapsed": t1 - t0,
+        "timings": events,
+        "usage": [dict(r, model=r["model"] or model_name) for r in meter.records],
     }
+    if error is not None:
+        record["error"] = error
+    if hedge_outcome is not None:
+        record["hedge"] = hedge_outcome
+    return record
+
+
+def run_case_framework(case_name: str, framework: str, repetition: int = 0, instance: dict | None = None,
+                       store: ResponseStore | None = None, mode: str | None = None,
+                       timeout: float | None = None, hedge: bool = False) -> dict:
+    """
+    Run one (case, framework) cell and score it.
+
+    `instance` is a pre-rendered case (e.g. one row of a suite from iter_case_instances);
+    without it the plain case YAML is used. The runner method is chosen by the case `type`.
+    mode="record" saves the raw output to `store`; mode="replay" serves it from `store`
+    without importing the framework or touching the network. `timeout` (seconds) bounds the
+    runner call; a cell that hits it is scored on empty output and carries an `error`.
+    """
+    case = instance if instance is not None else load_case(case_name)
+    instance_id = case.get("instance_id") or case_name
+    with tracing.span("cell", cat="cell", framework=framework, instance=instance_id, repetition=repetition):
+        system_prompt, user_prompt = get_prompts(case)
+        temperature, model_name = get_llm_config(case)
+
+        key = None
+        if mode in ("record", "replay"):
+            key = response_key(framework, instance_id, model_name, temperature, system_prompt, user_prompt,
+                               repetition)
+
+        if mode == "replay":
+            record = store.get(key)
+            if record is None:
+                raise LookupError(f"No recorded response for case={instance_id} framework={framework} "
+                                  f"repetition={repetition} (key {key[:12]})")
+        else:
+            from common.utils import framework_worker
+            pool = framework_worker.get_pool()
+            if pool is None:
+                record = _call_runner(case_type(case), framework, system_prompt, user_prompt, model_name, temperature,
+                                      timeout=timeout, hedge=hedge)
+            else:
+                # --isolate: the call runs in the framework's own warm worker process
+                with tracing.span("runner_call", cat="llm", runner=framework, model=model_name, isolated=True):
+                    try:
+                        record = pool.worker(framework).call(case_type(case), system_prompt, user_prompt, model_name,
+                                                             temperature, timeout=timeout, hedge=hedge)
+                    except framework_worker.WorkerCrashed as e:
+                        # no call completed: no elapsed time to report
+                        record = {"output": "", "elapsed": None, "timings": [], "usage": [], "error": str(e)}
+                    call_end = time.perf_counter()
+                if tracing.enabled() and record["timings"]:
+                    # the worker's marks are relative to its call start; anchor them on this process's clock
+                    tl = timing.Timeline()
+                    tl.t0 = call_end - (record["elapsed"] or 0.0)
+                    tl.events = [e for e in record["timings"] if e["event"] != timing.RUNNER_INIT]
+                    tracing.timeline_events(tl, framework)
+            if mode == "record" and "error" not in record:
+                store.put(key, {
+                    "framework": framework,
+                    "case": instance_id,
+                    "model": model_name,
+                    "temperature": temperature,
+                    **record,
+                })
+        output_text, elapsed = record["output"], record["elapsed"]
+        if "error" in record:
+            # a call that never answered (deadline, crash) is not a latency sample
+            elapsed = None
+
+        # Build metrics from case.yaml
+        expectations = case.get("expectations", {}) or {}
+        metric_list = case.get("metrics", []) or []
+
+        from metrics.registry import ScoringContext, score_all
+
+        # Metrics are looked up by name; shared artifacts (code block, sandbox run,
+        # parsed ints) are computed once per output however many metrics use them
+        ctx = ScoringContext(output_text, expectations, elapsed,
+                             timings=record.get("timings"), usage=record.get("usage"), model=model_name)
+        scores = score_all(metric_list, ctx)
+
+        cfg_hash = config_hash(case, framework)
+        result = {
+            "cell": cell_key(instance_id, framework, repetition, cfg_hash),
+            "case": case_name,
+            "instance": instance_id,
+            "framework": framework,
+            "repetition": repetition,
+            "model": model_name,
+            "config_hash": cfg_hash,
+            "output": output_text,
+            "metrics": scores,
+            "timings": record.get("timings", []),
+            "usage": record.get("usage", []),
+        }
+        for extra in ("error", "hedge"):
+            if extra in record:
+                result[extra] = record[extra]
+        return result
+
+
+def _summary_view(res: dict) -> dict:
+    # what the end-of-sweep summaries need; outputs and timelines stay on disk
+    return {k: res.get(k) for k in ("cell", "case", "instance", "framework", "repetition", "model", "metrics",
+                                    "error", "hedge")}
+
+
+def iter_cells(cases: list[str], frameworks: list[str], repeat: int = 1, warmup: int = 0):
+    """
+    Lazily yield (case, framework, repetition, instance) cells.
+
+    Repetitions are the outer loop so slow drift (network, rate limits) spreads across
+    frameworks; warm-up repetitions are numbered negative. Suite instances are streamed
+    from their dataset on every pass rather than held in memory.
+    """
+    for rep in range(-max(0, warmup), max(1, repeat)):
+        for case_name in cases:
+            for inst in iter_case_instances(case_name):
+                for fw in frameworks:
+                    yield case_name, fw, rep, inst
+
+
+def merge_main(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(prog="runner.py merge",
+                                 description="Combine shard/worker result files into one, one record per cell")
+    ap.add_argument("inputs", nargs="+", help="JSONL result files written with --output")
+    ap.add_argument("--output", "-o", required=True, help="Merged JSONL file (overwritten)")
+    args = ap.parse_args(argv)
+    try:
+        stats = merge_results(args.inputs, args.output)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"Merged {len(args.inputs)} file(s): {stats['read']} record(s) read, "
+          f"{stats['written']} written, {stats['duplicates']} duplicate(s) dropped")
+
+
+def loadtest_main(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(prog="runner.py loadtest",
+                                 description="Ramp concurrent sessions against framework runners and find the saturation knee")
+    ap.add_argument("--frameworks", "-f", type=str, default="mock", help="Comma-separated frameworks, tested one after another")
+    ap.add_argument("--case", "-c", type=str, default="fibonacci", help="Case whose prompt every request sends")
+    ap.add_argument("--max-concurrency", "-n", type=int, default=16, help="Ramp 1, 2, 4, ... up to this many sessions")
+    ap.add_argument("--levels", type=str, default=None, help="Explicit concurrency levels instead (e.g., 1,2,4,8,12)")
+    ap.add_argument("--duration", type=float, default=30.0, help="Measured seconds per level")
+    ap.add_argument("--warmup", type=float, default=0.0, help="Unmeasured seconds at the start of each level")
+    ap.add_argument("--output", "-o", type=str, default=None, help="Write the full report as JSON")
+    args = ap.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from common.utils import loadtest
 
+    load_dotenv()
+    levels = ([int(x) for x in args.levels.split(",") if x.strip()] if args.levels
+              else loadtest.levels_up_to(args.max_concurrency))
+    case = load_case(args.case)
+    system_prompt, user_prompt = get_prompts(case)
+    temperature, model_name = get_llm_config(case)
+    kind = case_type(case)
+
+    reports = {}
+    for fw in [x.strip() for x in args.frameworks.split(",") if x.strip()]:
+        runner, _ = get_runner(fw)
+        arun_func = getattr(runner, f"arun_{kind}", None)
+        run_func = getattr(runner, f"run_{kind}", None)
+        if arun_func is None and run_func is None:
+            ap.error(f"framework '{fw}' does not implement case type '{kind}'")
+
+        def factory(arun_func=arun_func, run_func=run_func):
+            if arun_func is not None:
+                return arun_func(system_prompt, user_prompt, model_name, temperature)
+            import asyncio
+            return asyncio.to_thread(run_func, system_prompt, user_prompt, model_name, temperature)
+
+        print(f"Load testing {fw} on {args.case}: levels {levels}, {args.duration:g}s each")
+        report = loadtest.run_loadtest(factory, levels, args.duration, args.warmup,
+                                       on_level=lambda r: print(loadtest.format_level(r), flush=True))
+        print(loadtest.format_summary(fw, args.case, report))
+        reports[fw] = dict(report, case=args.case, model=model_name, duration_s=args.duration)
+
+    if args.output:
+        import json
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "merge":
+        return merge_main(argv[1:])
+    if argv and argv[0] == "loadtest":
+        return loadtest_main(argv[1:])
 
-def main():
-    ap = argparse.ArgumentParser(description="Agent Eval Runner")
+    ap = argparse.ArgumentParser(description="Agent Eval Runner (subcommands: merge, loadtest)")
+    ap.add_argument("--list-frameworks", action="store_true",
+                    help="List known frameworks and their supported cases, then exit")
     ap.add_argument("--frameworks", "-f", type=str, default="crewai",
                     help="Comma-separated frameworks (e.g., crewai,adk)")
     ap.add_argument("--cases", "-c", type=str, default="fibonacci",
-                    help="Comma-separated case names (e.g., fibonacci,sorting)")
-    args = ap.parse_args()
+                    help="Comma-separated case or suite names (e.g., fibonacci,fibonacci_suite)")
+    ap.add_argument("--concurrency", "-j", type=int, default=1,
+                    help="Max number of (case, framework) cells running at once")
+    ap.add_argument("--framework-limit", type=str, default="",
+                    help="Per-framework concurrency caps (e.g., crewai=2,adk=1)")
+    ap.add_argument("--provider-limit", type=str, default="",
+                    help="Per-provider concurrency caps (e.g., openrouter=4,google=2)")
+    ap.add_argument("--rate-limit", action="append", default=[], metavar="PROVIDER:OPTS",
+                    help="Provider request/token budget, repeatable (e.g., openrouter:rpm=60,tpm=200000,max_retries=3)")
+    store_mode = ap.add_mutually_exclusive_group()
+    store_mode.add_argument("--record", action="store_true",
+                            help="Save raw runner outputs to the response store")
+    store_mode.add_argument("--replay", action="store_true",
+                            help="Score stored outputs instead of calling the frameworks")
+    ap.add_argument("--repeat", type=int, default=1,
+                    help="Measured runs per cell; with N > 1 a statistical summary is printed")
+    ap.add_argument("--warmup", type=int, default=0,
+                    help="Unmeasured warm-up runs per cell before the measured ones")
+    ap.add_argument("--store-dir", type=str, default=None,
+                    help="Response store directory (default: $AE_RESPONSE_STORE or .response_store)")
+    ap.add_argument("--output", "-o", type=str, default=None,
+                    help="Append one JSON line per completed cell to this file")
+    ap.add_argument("--resume", action="store_true",
+                    help="Skip cells already completed in --output (same case, framework, repetition and config)")
+    ap.add_argument("--fsync", action="store_true",
+                    help="fsync the --output file after every record")
+    ap.add_argument("--cell-timeout", type=float, default=None,
+                    help="Cancel a runner call after this many seconds and score the cell as failed")
+    ap.add_argument("--sweep-timeout", type=float, default=None,
+                    help="Stop starting cells after this many seconds; in-flight cells get the remaining time")
+    ap.add_argument("--hedge", action="store_true",
+                    help="Fire a duplicate call when one runs past the observed p95 for its framework/model")
+    distribute = ap.add_mutually_exclusive_group()
+    distribute.add_argument("--shard", type=str, default=None, metavar="I/N",
+                            help="Run only shard I of N (0-based); cells are assigned by hash of instance, framework and repetition")
+    distribute.add_argument("--queue", type=str, default=None, metavar="DIR",
+                            help="Claim cells from a work-queue directory shared by several workers (requires --output)")
+    ap.add_argument("--queue-lease", type=float, default=3600.0,
+                    help="Seconds after which an unfinished claim in --queue is considered abandoned")
+    ap.add_argument("--isolate", action="store_true",
+                    help="Run each framework in its own long-lived worker process (warm, parallel, crash-isolated)")
+    ap.add_argument("--trace", type=str, default=None, metavar="PATH",
+                    help="Write a Chrome trace-event / Perfetto timeline of the sweep to PATH (JSON)")
+    ap.add_argument("--profile", type=str, default=None, metavar="DIR",
+                    help="Profile every cell (cProfile + tracemalloc) into DIR; cells then run one at a time")
+    ap.add_argument("--profile-top", type=int, default=25,
+                    help="Hot functions listed per cell and in the aggregate --profile report")
+    ap.add_argument("--quiet", "-q", action="store_true",
+                    help="Don't print per-cell outputs (useful for large suites); summaries are still printed")
+    args = ap.parse_args(argv)
+    if args.resume and not args.output:
+        ap.error("--resume requires --output")
+    if args.profile and args.isolate:
+        ap.error("--profile measures runners in this process; it can't be combined with --isolate")
+    if args.queue and not args.output:
+        ap.error("--queue requires --output (one result file per worker; combine them with `merge`)")
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            ap.error(str(e))
+
+    if args.list_frameworks:
+        for name in fw_manifest.available():
+            spec = fw_manifest.spec(name)
+            print(f"{name:<12} provider={spec.get('provider', name):<12} case_types={','.join(spec.get('case_types') or [])}")
+        return
+
+    from dotenv import load_dotenv
+
+    # load .env if present
+    load_dotenv()
 
     frameworks = [x.strip() for x in args.frameworks.split(",") if x.strip()]
     cases = [x.strip() for x in args.cases.split(",") if x.strip()]
 
+    # fail before spending anything if the manifest says a cell can't run
+    for fw in frameworks:
+        supported = fw_manifest.supported_case_types(fw)
+        unsupported = [c for c in cases if supported is not None and case_type(load_case(c)) not in supported]
+        if unsupported:
+            ap.error(f"framework '{fw}' does not support case(s): {', '.join(unsupported)}")
+
+    if args.rate_limit:
+        from common.utils import rate_limit
+        for spec in args.rate_limit:
+            try:
+                provider, options = rate_limit.parse_spec(spec)
+                rate_limit.configure(provider, **options)
+                rate_limit.limiter(provider)  # validate option names now rather than mid-sweep
+            except (ValueError, TypeError) as e:
+                ap.error(f"--rate-limit {spec}: {e}")
+
+    if args.trace:
+        tracing.start(args.trace)
+    if args.isolate and not args.replay:
+        from common.utils import framework_worker
+        framework_worker.start_pool({"rate_limits": args.rate_limit, "executor_workers": args.concurrency + 4,
+                                     "max_calls": args.concurrency}, frameworks)
+    elif args.concurrency > 1 and not args.replay:
+        from common.utils import event_loop
+        event_loop.ensure_executor_workers(args.concurrency + 4)
+
+    profiler = None
+    if args.profile:
+        from common.utils.profiling import Profiler
+        if args.concurrency > 1:
+            print("--profile: running cells one at a time so each profile covers a single cell")
+            args.concurrency = 1
+        profiler = Profiler(args.profile, top_n=args.profile_top)
+
+    scheduler = MatrixScheduler(
+        concurrency=args.concurrency,
+        framework_limits=parse_limits(args.framework_limit),
+        provider_limits=parse_limits(args.provider_limit),
+    )
+    # warm-up repetitions are numbered negative and dropped from the results
+    cells = iter_cells(cases, frameworks, args.repeat, args.warmup)
+    if shard is not None:
+        index, count = shard
+        # warm-ups warm this worker's runners, so every shard runs them all
+        cells = (c for c in cells if c[2] < 0 or shard_of(c[3]["instance_id"], c[1], c[2], count) == index)
+
+    sweep_keys: set[str] = set()
+    if args.resume:
+        done = completed_cells(args.output)
+
+        def _pending(all_cells):
+            skipped = 0
+            for case_name, fw, rep, inst in all_cells:
+                key = cell_key(inst["instance_id"], fw, rep, config_hash(inst, fw))
+                if rep >= 0:
+                    sweep_keys.add(key)
+                    if key in done:
+                        skipped += 1
+                        continue
+                yield case_name, fw, rep, inst
+            print(f"Resumed: {skipped} cell(s) were already complete")
+
+        cells = _pending(cells)
+
+    mode = "record" if args.record else "replay" if args.replay else None
+    store = ResponseStore(args.store_dir) if args.store_dir else ResponseStore()
+    sink = JsonlSink(args.output, fsync=args.fsync) if args.output else None
+
+    sweep_deadline = time.monotonic() + args.sweep_timeout if args.sweep_timeout else None
+    not_started = 0
+
+    def _until_deadline(all_cells):
+        nonlocal not_started
+        for cell in all_cells:
+            if time.monotonic() >= sweep_deadline:
+                # unstarted cells aren't written, so --resume picks them up later
+                not_started += 1
+                continue
+            yield cell
+
+    if sweep_deadline is not None:
+        cells = _until_deadline(cells)
+
+    queue = WorkQueue(args.queue, lease_s=args.queue_lease) if args.queue else None
+    claimed_elsewhere = 0
+    # stand-ins for results of cells this process didn't run
+    DEADLINE_PASSED, OTHER_WORKER = object(), object()
+
+    def run_cell(case_name: str, fw: str, rep: int, inst: dict):
+        timeout = args.cell_timeout
+        if sweep_deadline is not None:
+            remaining = sweep_deadline - time.monotonic()
+            if remaining <= 0:
+                return DEADLINE_PASSED  # queued but never started: left for --resume
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        key = None
+        if queue is not None and rep >= 0:
+            # warm-ups run on every worker, outside the queue;
+            # claim when the cell actually starts, so idle workers can take what this one hasn't begun
+            key = cell_key(inst["instance_id"], fw, rep, config_hash(inst, fw))
+            if not queue.claim(key):
+                return OTHER_WORKER
+        try:
+            if profiler is not None:
+                with profiler.cell(cell_key(inst["instance_id"], fw, rep, config_hash(inst, fw)), fw):
+                    res = run_case_framework(case_name, fw, rep, inst, store=store, mode=mode,
+                                             timeout=timeout, hedge=args.hedge)
+            else:
+                res = run_case_framework(case_name, fw, rep, inst, store=store, mode=mode,
+                                         timeout=timeout, hedge=args.hedge)
+        except BaseException:
+            if key is not None:
+                queue.release(key)
+            raise
+        # persist as soon as the cell finishes, not when its turn to print comes
+        if sink is not None and rep >= 0:
+            sink.write(res)
+        if key is not None:
+            queue.complete(key)
+        return res
+
     all_results = []
-    for case_name in cases:
-        for fw in frameworks:
-            res = run_case_framework(case_name, fw)
-            all_results.append(res)
+    try:
+        # results come back in matrix order, whatever order the cells finish in
+        for (case_name, fw, rep, inst), res in scheduler.run(cells, run_cell):
+            if res is DEADLINE_PASSED:
+                not_started += 1
+                continue
+            if res is OTHER_WORKER:
+                claimed_elsewhere += 1
+                continue
+            if rep < 0:
+                continue
+            all_results.append(_summary_view(res))
+            if args.quiet:
+                continue
             # simple console report
-            print(f"\n=== CASE: {case_name} | FRAMEWORK: {fw} ===")
+            run_label = f" | RUN: {rep + 1}/{args.repeat}" if args.repeat > 1 else ""
+            print(f"\n=== CASE: {res['instance']} | FRAMEWORK: {fw}{run_label} ===")
             print(res["output"])
+            if res.get("error"):
+                print("Error:", res["error"])
             print("Metrics:", res["metrics"])
+    finally:
+        if sink is not None:
+            sink.close()
+        if args.trace:
+            tracing.stop()
+            print(f"Trace written to {args.trace} (open in https://ui.perfetto.dev)")
+
+    if profiler is not None:
+        print(profiler.close())
+    if args.isolate and not args.replay:
+        from common.utils import framework_worker
+        restarts = framework_worker.get_pool().restarts()
+        if restarts:
+            print("Worker restarts after crashes: " + ", ".join(f"{fw}={n}" for fw, n in restarts.items()))
+    if not_started:
+        print(f"Sweep deadline reached: {not_started} cell(s) not started")
+    if queue is not None:
+        print(f"Work queue: {len(all_results)} cell(s) run here, {claimed_elsewhere} done or claimed by other workers")
+    failed = sum(1 for r in all_results if r.get("error"))
+    if failed:
+        print(f"{failed} cell(s) got no answer (deadline, worker crash or retries exhausted); see their `error`")
+    if args.hedge:
+        from common.utils.deadlines import summarize_hedges
+        h = summarize_hedges(all_results)
+        print(f"Hedging: {h['fired']}/{h['calls']} call(s) hedged, duplicate won {h['hedge_won']}")
+
+    if args.resume:
+        # summaries cover the whole sweep, including cells finished by earlier runs
+        # (a cell rerun after a deadline or crash keeps only its best record)
+        all_results = [_summary_view(r) for r in best_results(args.output, sweep_keys).values()]
+
+    if any("tokens_total" in r["metrics"] for r in all_results):
+        from metrics.cost import summarize_costs, format_cost_summary
+        print(format_cost_summary(summarize_costs(all_results)))
+
+    if args.repeat > 1:
+        from common.utils.bench_stats import summarize, format_summary
+        print(format_summary(summarize(all_results)))
 
 
 if __name__ == "__main__":